@@ -0,0 +1,308 @@
+"""
+Artefacts pré-calculés d'un article : HTML assaini, sommaire, SEO, JSON-LD.
+
+Tout est produit en une seule passe sur le markdown (ligne par ligne), pour
+que le site Next.js n'ait plus à parser/rendre l'article à chaque affichage.
+Le rendu couvre le sous-ensemble markdown produit par le modèle : titres,
+paragraphes, listes, citations, séparateurs, blocs de code, gras/italique,
+code en ligne et liens. Le texte source est toujours échappé : aucune balise
+HTML venue du modèle n'atteint la sortie.
+"""
+import html
+import math
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from app.agents.blogBot.schemas import BlogArtifacts, SeoArtifacts, TocEntry
+
+
+WORDS_PER_MINUTE = 230
+TOC_LEVELS = (2, 3)
+META_DESCRIPTION_MAX = 155
+TITLE_MAX = 60
+BRAND = "Cozetik"
+SAFE_URL_PREFIXES = ("http://", "https://", "mailto:", "/", "#")
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_HR = re.compile(r"^([-*_])(\s*\1){2,}\s*$")
+_UL_ITEM = re.compile(r"^\s*[-*+]\s+(.*)$")
+_OL_ITEM = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_QUOTE = re.compile(r"^\s*>\s?(.*)$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+
+_CODE_SPAN = re.compile(r"`([^`]+)`")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_ITALIC = re.compile(r"(?<![\*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\*)|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)")
+_MARKERS = re.compile(r"\*\*|__|(?<!\w)[*_]|[*_](?!\w)|`")
+_WORD = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def slugify(text: str) -> str:
+    """"La Méthode (3 étapes)" -> "la-methode-3-etapes"."""
+    normalized = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", normalized.lower()).strip("-") or "section"
+
+
+def unique_anchor(title: str, anchors: Dict[str, int]) -> str:
+    """Ancre unique pour un titre ; `anchors` associe chaque ancre attribuée au
+    dernier suffixe utilisé pour ce slug.
+
+    "Intro", "Intro", "Intro 2" -> "intro", "intro-2", "intro-2-2" : le suffixe
+    est incrémenté tant que l'ancre est déjà prise.
+    """
+    base = slugify(title)
+    anchor, suffix = base, anchors.get(base, 1)
+    while anchor in anchors:
+        suffix += 1
+        anchor = f"{base}-{suffix}"
+    anchors[base] = suffix
+    anchors.setdefault(anchor, 1)
+    return anchor
+
+
+def plain_text(markdown_inline: str) -> str:
+    """Texte brut d'un fragment markdown (liens réduits à leur libellé, marqueurs retirés)."""
+    text = _LINK.sub(r"\1", markdown_inline)
+    return _MARKERS.sub("", text).strip()
+
+
+def _safe_url(url: str) -> Optional[str]:
+    return url if url.lower().startswith(SAFE_URL_PREFIXES) else None
+
+
+def _render_link(match: re.Match) -> str:
+    label, url = match.group(1), _safe_url(html.unescape(match.group(2)))
+    if url is None:
+        return label
+    return f'<a href="{html.escape(url, quote=True)}">{label}</a>'
+
+
+def render_inline(text: str) -> str:
+    """Rend le markdown en ligne en HTML ; le texte est échappé avant tout balisage."""
+    parts = _CODE_SPAN.split(text)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            # Segment de code : échappé, jamais interprété
+            out.append(f"<code>{html.escape(part)}</code>")
+            continue
+        escaped = html.escape(part, quote=False)
+        escaped = _LINK.sub(_render_link, escaped)
+        escaped = _BOLD.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", escaped)
+        escaped = _ITALIC.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", escaped)
+        out.append(escaped)
+    return "".join(out)
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[: limit - 1].rsplit(" ", 1)[0].rstrip(" ,;:.-—")
+    return f"{cut}…"
+
+
+class ArtifactBuilder:
+    """Construit HTML, sommaire et métadonnées SEO en une passe.
+
+    `feed()` accepte des morceaux de texte arbitraires (ex: flux du modèle) ;
+    `finish()` vide les blocs ouverts et renvoie les artefacts.
+    """
+
+    def __init__(self, subject: str = "", published_at: Optional[str] = None, modified_at: Optional[str] = None):
+        self.subject = subject
+        self.published_at = published_at
+        self.modified_at = modified_at
+
+        self._pending = ""
+        self._html: List[str] = []
+        self._toc: List[TocEntry] = []
+        self._anchors: Dict[str, int] = {}
+        self._title: Optional[str] = None
+        self._first_paragraph: Optional[str] = None
+        self._lead_paragraph: Optional[str] = None
+        self._word_count = 0
+
+        self._paragraph: List[str] = []
+        self._quote: List[str] = []
+        self._list_tag: Optional[str] = None
+        self._list_item: Optional[List[str]] = None
+        self._in_code = False
+
+    # --- Entrée -----------------------------------------------------------
+
+    def feed(self, chunk: str) -> None:
+        data = self._pending + chunk
+        lines = data.split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._feed_line(line.rstrip("\r"))
+
+    def finish(self) -> BlogArtifacts:
+        if self._pending:
+            self._feed_line(self._pending)
+            self._pending = ""
+        if self._in_code:
+            self._html.append("</code></pre>")
+            self._in_code = False
+        self._close_blocks()
+
+        return BlogArtifacts(html="\n".join(self._html), toc=self._toc, seo=self._build_seo())
+
+    # --- Blocs ------------------------------------------------------------
+
+    def _feed_line(self, line: str) -> None:
+        if self._in_code:
+            if FENCE.match(line):
+                self._html.append("</code></pre>")
+                self._in_code = False
+            else:
+                self._html.append(html.escape(line))
+                self._count_words(line)
+            return
+
+        if FENCE.match(line):
+            self._close_blocks()
+            self._html.append("<pre><code>")
+            self._in_code = True
+            return
+
+        if not line.strip():
+            self._close_blocks()
+            return
+
+        heading = HEADING.match(line)
+        if heading:
+            self._close_blocks()
+            self._add_heading(len(heading.group(1)), heading.group(2))
+            return
+
+        if _HR.match(line):
+            self._close_blocks()
+            self._html.append("<hr>")
+            return
+
+        quote = _QUOTE.match(line)
+        if quote:
+            if not self._quote:
+                self._close_blocks()
+            self._quote.append(quote.group(1))
+            return
+
+        ul_item, ol_item = _UL_ITEM.match(line), _OL_ITEM.match(line)
+        if ul_item or ol_item:
+            tag = "ul" if ul_item else "ol"
+            if self._list_tag != tag:
+                self._close_blocks()
+                self._html.append(f"<{tag}>")
+                self._list_tag = tag
+            self._flush_list_item()
+            self._list_item = [(ul_item or ol_item).group(1)]
+            return
+
+        if self._list_item is not None and line[:1].isspace():
+            # Ligne de continuation d'un élément de liste
+            self._list_item.append(line.strip())
+            return
+
+        if self._list_tag or self._quote:
+            self._close_blocks()
+        self._paragraph.append(line.strip())
+
+    def _add_heading(self, level: int, raw: str) -> None:
+        title = plain_text(raw)
+        anchor = unique_anchor(title, self._anchors)
+
+        if level == 1 and self._title is None:
+            self._title = title
+        if level in TOC_LEVELS:
+            self._toc.append(TocEntry(level=level, title=title, anchor=anchor))
+
+        self._count_words(title)
+        self._html.append(f'<h{level} id="{anchor}">{render_inline(raw)}</h{level}>')
+
+    def _flush_list_item(self) -> None:
+        if self._list_item is None:
+            return
+        text = " ".join(self._list_item)
+        self._count_words(plain_text(text))
+        self._html.append(f"<li>{render_inline(text)}</li>")
+        self._list_item = None
+
+    def _close_blocks(self) -> None:
+        if self._paragraph:
+            text = " ".join(self._paragraph)
+            plain = plain_text(text)
+            self._count_words(plain)
+            if self._first_paragraph is None:
+                self._first_paragraph = plain
+            if self._lead_paragraph is None and len(plain) >= 80:
+                self._lead_paragraph = plain
+            self._html.append(f"<p>{render_inline(text)}</p>")
+            self._paragraph = []
+
+        if self._quote:
+            text = " ".join(q for q in self._quote if q.strip())
+            self._count_words(plain_text(text))
+            self._html.append(f"<blockquote><p>{render_inline(text)}</p></blockquote>")
+            self._quote = []
+
+        if self._list_tag:
+            self._flush_list_item()
+            self._html.append(f"</{self._list_tag}>")
+            self._list_tag = None
+
+    def _count_words(self, text: str) -> None:
+        self._word_count += len(_WORD.findall(text))
+
+    # --- SEO --------------------------------------------------------------
+
+    def _build_seo(self) -> SeoArtifacts:
+        title = self._title or self.subject
+        description = _truncate(self._lead_paragraph or self._first_paragraph or title, META_DESCRIPTION_MAX)
+        reading_time = max(1, math.ceil(self._word_count / WORDS_PER_MINUTE))
+
+        candidates = [title]
+        branded = f"{title} | {BRAND}"
+        if len(branded) <= TITLE_MAX:
+            candidates.append(branded)
+        candidates.append(_truncate(title, TITLE_MAX))
+        if self.subject:
+            candidates.append(_truncate(self.subject, TITLE_MAX))
+        candidates = list(dict.fromkeys(c for c in candidates if c))
+
+        organization = {"@type": "Organization", "name": BRAND}
+        json_ld = {
+            "@context": "https://schema.org",
+            "@type": "BlogPosting",
+            "headline": _truncate(title, 110),
+            "description": description,
+            "inLanguage": "fr-FR",
+            "wordCount": self._word_count,
+            "timeRequired": f"PT{reading_time}M",
+            "author": organization,
+            "publisher": organization,
+        }
+        if self._toc:
+            json_ld["articleSection"] = [entry.title for entry in self._toc if entry.level == TOC_LEVELS[0]]
+        if self.published_at:
+            json_ld["datePublished"] = self.published_at
+        if self.modified_at:
+            json_ld["dateModified"] = self.modified_at
+
+        return SeoArtifacts(
+            title_candidates=candidates,
+            meta_description=description,
+            reading_time_minutes=reading_time,
+            word_count=self._word_count,
+            json_ld=json_ld,
+        )
+
+
+def build_artifacts(
+    markdown: str, subject: str = "", published_at: Optional[str] = None, modified_at: Optional[str] = None
+) -> BlogArtifacts:
+    builder = ArtifactBuilder(subject=subject, published_at=published_at, modified_at=modified_at)
+    builder.feed(markdown)
+    return builder.finish()
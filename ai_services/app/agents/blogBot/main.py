@@ -1,23 +1,47 @@
 import os
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
 from anthropic import Anthropic
 from dotenv import load_dotenv
 
+from app.model_registry import model_router
+
 # Charger le .env local si disponible (dev) ou utiliser les env vars système (Render)
 load_dotenv()
 
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
-MODEL = "claude-haiku-4-5-20251001"
+
+# Marque le prompt système (corpus Cozetik, identique pour tous les sujets)
+# comme préfixe cacheable côté Anthropic
+BLOG_CACHE_PREFIX = os.getenv("BLOG_CACHE_PREFIX", "0") == "1"
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def load_corpus_files(data_dir: Path = DATA_DIR, exclude: Iterable[str] = ()) -> Dict[str, str]:
+    """Texte de chaque document du corpus, par nom de fichier.
+
+    Lu une seule fois par génération : le même dictionnaire sert à construire
+    le contexte et à enregistrer les versions du corpus de l'article.
+    """
+    excluded = set(exclude)
+    return {
+        f.name: f.read_text(encoding="utf-8")
+        for f in sorted(Path(data_dir).glob("*.txt"))
+        if f.name not in excluded
+    }
+
+
+def format_context(files: Dict[str, str]) -> str:
+    return "\n\n".join(f"### {name}\n{text}" for name, text in files.items())
 
 
-def load_cozetik_context() -> str:
+def load_cozetik_context(exclude: Iterable[str] = ()) -> str:
     """Concatène les documents de marque Cozetik pour les injecter directement
-    dans le contexte de Claude (corpus petit → pas besoin de RAG/embeddings)."""
-    parts = []
-    for f in sorted(DATA_DIR.glob("*.txt")):
-        parts.append(f"### {f.name}\n{f.read_text(encoding='utf-8')}")
-    return "\n\n".join(parts)
+    dans le contexte de Claude (corpus petit → pas besoin de RAG/embeddings).
+    `exclude` retire des documents par nom de fichier (contexte réduit)."""
+    return format_context(load_corpus_files(DATA_DIR, exclude))
 
 
 def load_prompt(filename: str) -> str:
@@ -30,37 +54,69 @@ def load_prompt(filename: str) -> str:
 COZETIK_CONTEXT = load_cozetik_context()
 
 
-def generate_blog(subject, with_metadata=True):
-    template = load_prompt("blog_system_prompt.txt")
-    prompt_instruction = template.replace("{subject}", subject)
-
-    system = (
+def build_system_prompt(context: str = COZETIK_CONTEXT) -> str:
+    return (
         "Tu es le rédacteur du blog de COZETIK, organisme de formation. "
         "Appuie-toi EXCLUSIVEMENT sur la base de connaissances ci-dessous pour "
         "rester fidèle à l'ADN, au ton et au catalogue de la marque. N'invente "
         "ni chiffre ni fait absent de cette base.\n\n"
-        f"=== BASE DE CONNAISSANCES COZETIK ===\n{COZETIK_CONTEXT}"
+        f"=== BASE DE CONNAISSANCES COZETIK ===\n{context}"
     )
 
-    client = Anthropic()  # lit ANTHROPIC_API_KEY dans l'environnement
-    print(f"Génération en cours pour : {subject}...")
-    message = client.messages.create(
-        model=MODEL,
-        max_tokens=4096,
-        temperature=0.7,
+
+def generate_blog(
+    subject,
+    with_metadata=True,
+    context: Optional[str] = None,
+    cache_prefix: bool = BLOG_CACHE_PREFIX,
+    stream: bool = False,
+    on_text: Optional[Callable[[str], None]] = None,
+    client=None,
+):
+    """Rédige l'article ; `on_text` reçoit le texte au fil de l'eau si `stream`
+    (en un seul bloc sinon). `context` remplace le corpus complet et `client`
+    le client Anthropic (benchmark, tests)."""
+    template = load_prompt("blog_system_prompt.txt")
+    prompt_instruction = template.replace("{subject}", subject)
+
+    system = build_system_prompt() if context is None else build_system_prompt(context)
+    if cache_prefix:
+        system = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+    # Modèle, max_tokens et température : profil "blog" du registre de modèles
+    decision = model_router.route("blog")
+    client = client or Anthropic()  # lit ANTHROPIC_API_KEY dans l'environnement
+    request = dict(
+        model=decision.model_id,
+        max_tokens=decision.max_tokens,
+        temperature=decision.temperature,
         system=system,
         messages=[{"role": "user", "content": prompt_instruction}],
     )
+    print(f"Génération en cours pour : {subject} ({decision.model_id})...")
+    with model_router.track(decision):
+        if stream:
+            with client.messages.stream(**request) as response:
+                for text in response.text_stream:
+                    if on_text is not None:
+                        on_text(text)
+                message = response.get_final_message()
+        else:
+            message = client.messages.create(**request)
     article = "".join(
         block.text
         for block in message.content
         if getattr(block, "type", None) == "text"
     )
+    if on_text is not None and not stream:
+        on_text(article)
 
     metadata = {}
     if with_metadata:
         metadata = {
-            "model": MODEL,
+            "model": decision.model_id,
+            "routing_reason": decision.reason,
+            "usage": {field: getattr(message.usage, field, None) or 0 for field in USAGE_FIELDS},
             "scores": {
                 "coherence_adn": 0.95,
                 "expert_tech": 0.95,
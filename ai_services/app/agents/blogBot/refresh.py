@@ -0,0 +1,335 @@
+"""
+Rafraîchissement ciblé d'articles existants.
+
+Quand un prix ou un CTA change dans le corpus, on ne régénère que les sections
+concernées (ex: CTA, LA MÉTHODE), le reste de l'article servant de contexte
+figé. Les versions du corpus utilisées à la génération sont conservées par le
+store : en les comparant aux fichiers actuels, on retrouve les articles (et
+les sections) qui citent un élément retiré ou modifié.
+"""
+import difflib
+import hashlib
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from anthropic import Anthropic
+
+from app.agents.blogBot.artifacts import FENCE, HEADING, build_artifacts, plain_text, slugify, unique_anchor
+from app.agents.blogBot.main import DATA_DIR, build_system_prompt, format_context, load_corpus_files
+from app.agents.blogBot.schemas import SectionDiff, StaleArticle, StoredArticle
+from app.agents.blogBot.store import ArticleStore, now_iso
+from app.model_registry import RoutingDecision, model_router
+
+
+SECTION_MARKER = "@@@ "
+
+_PRICE = re.compile(r"\d[\d\s]*(?:[.,]\d+)?\s*€")
+_QUOTED = re.compile(r"[«\"“]\s*([^»\"”]{15,}?)\s*[»\"”]")
+_DIGIT_SPACES = re.compile(r"(?<=\d)\s+(?=[\d€])")
+_LEADING_ARTICLE = re.compile(r"^(?:le|la|les|l)-")
+_LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*+])\s+")
+
+
+class SectionNotFound(ValueError):
+    """Section demandée absente de l'article."""
+
+
+class Section:
+    def __init__(self, heading: str = "", level: int = 0, title: str = "", anchor: str = ""):
+        self.heading = heading
+        self.level = level
+        self.title = title
+        self.anchor = anchor
+        self.body: List[str] = []
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.body).strip()
+
+    def lines(self) -> List[str]:
+        return ([self.heading] if self.heading else []) + self.body
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """Découpe l'article en sections (une par titre) ; ancres identiques au rendu HTML."""
+    sections = [Section()]
+    anchors: Dict[str, int] = {}
+    in_code = False
+
+    for line in markdown.split("\n"):
+        if FENCE.match(line):
+            in_code = not in_code
+        heading = None if in_code else HEADING.match(line)
+        if heading is None:
+            sections[-1].body.append(line)
+            continue
+
+        title = plain_text(heading.group(2))
+        anchor = unique_anchor(title, anchors)
+        sections.append(Section(line, len(heading.group(1)), title, anchor))
+
+    return sections
+
+
+def join_sections(sections: List[Section]) -> str:
+    markdown = "\n".join(line for section in sections for line in section.lines())
+    return re.sub(r"\n{3,}", "\n\n", markdown).strip() + "\n"
+
+
+def _without_article(anchor: str) -> str:
+    return _LEADING_ARTICLE.sub("", anchor)
+
+
+def match_sections(sections: List[Section], requested: List[str]) -> List[Section]:
+    """Associe les noms demandés ("CTA", "LA MÉTHODE") aux sections de l'article.
+
+    Correspondance exacte sur l'ancre, au déterminant initial près
+    ("MÉTHODE" -> "la-methode") : un nom qui ne désigne pas exactement une
+    section lève SectionNotFound.
+    """
+    headed = [s for s in sections if s.level]
+    matched: List[Section] = []
+    for name in requested:
+        slug = slugify(name)
+        found = [s for s in headed if s.anchor == slug]
+        if not found:
+            found = [s for s in headed if _without_article(s.anchor) == _without_article(slug)]
+        if len(found) != 1:
+            available = ", ".join(f"{s.title} ({s.anchor})" for s in headed)
+            problem = "introuvable" if not found else "ambiguë"
+            raise SectionNotFound(f"Section {problem}: {name} (sections: {available})")
+        if found[0] not in matched:
+            matched.append(found[0])
+    return matched
+
+
+def _complete(system: str, prompt: str, decision: RoutingDecision) -> str:
+    client = Anthropic()  # lit ANTHROPIC_API_KEY dans l'environnement
+    with model_router.track(decision):
+        message = client.messages.create(
+            model=decision.model_id,
+            max_tokens=decision.max_tokens,
+            temperature=decision.temperature,
+            system=system,
+            messages=[{"role": "user", "content": prompt}],
+        )
+    return "".join(
+        block.text
+        for block in message.content
+        if getattr(block, "type", None) == "text"
+    )
+
+
+def _build_refresh_prompt(markdown: str, targets: List[Section]) -> str:
+    listing = "\n".join(f"- {s.anchor} (titre : {s.title})" for s in targets)
+    return (
+        "Voici un article existant du blog Cozetik. Réécris UNIQUEMENT les sections "
+        "listées ci-dessous en t'appuyant sur la base de connaissances à jour (prix, "
+        "offres, CTA). Le reste de l'article est figé : garde le même ton, la même "
+        "structure et ne répète pas son contenu.\n\n"
+        f"SECTIONS À RÉÉCRIRE :\n{listing}\n\n"
+        f"=== ARTICLE ACTUEL ===\n{markdown}\n=== FIN DE L'ARTICLE ===\n\n"
+        "FORMAT DE RÉPONSE : pour chaque section, une ligne "
+        f"`{SECTION_MARKER}<identifiant>` puis le nouveau contenu de la section, "
+        "sans son titre. Rien d'autre."
+    )
+
+
+def _parse_refresh_output(output: str) -> Dict[str, str]:
+    parts: Dict[str, List[str]] = {}
+    current: Optional[str] = None
+    for line in output.split("\n"):
+        if line.startswith(SECTION_MARKER):
+            current = line[len(SECTION_MARKER):].strip().strip("`")
+            parts[current] = []
+        elif current is not None:
+            parts[current].append(line)
+    return {anchor: "\n".join(lines).strip() for anchor, lines in parts.items()}
+
+
+def regenerate_sections(
+    article: StoredArticle,
+    requested: List[str],
+    store: ArticleStore,
+    complete: Callable[[str, str, RoutingDecision], str] = _complete,
+) -> Tuple[StoredArticle, List[SectionDiff], RoutingDecision]:
+    """Régénère les sections demandées, enregistre l'article et renvoie (article, diffs, choix du modèle)."""
+    sections = split_sections(article.markdown)
+    targets = match_sections(sections, requested)
+
+    # Corpus relu depuis le disque : c'est justement lui qui a changé
+    corpus = load_corpus()
+    system = build_system_prompt(format_context(corpus))
+    decision = model_router.route("blog_refresh", signal=f"{len(targets)} section(s)")
+    output = _parse_refresh_output(complete(system, _build_refresh_prompt(article.markdown, targets), decision))
+
+    diffs = []
+    for section in targets:
+        new_text = output.get(section.anchor)
+        if not new_text:
+            raise RuntimeError(f"Le modèle n'a pas renvoyé la section {section.anchor}")
+        before = section.text
+        section.body = [""] + new_text.split("\n") + [""]
+        diffs.append(SectionDiff(
+            title=section.title,
+            anchor=section.anchor,
+            before=before,
+            after=new_text,
+            diff=list(difflib.unified_diff(
+                before.split("\n"), new_text.split("\n"), "avant", "après", lineterm="", n=1
+            )),
+        ))
+
+    markdown = join_sections(sections)
+    updated_at = now_iso()
+    updated = article.model_copy(update={
+        "markdown": markdown,
+        "artifacts": build_artifacts(
+            markdown, subject=article.subject, published_at=article.created_at, modified_at=updated_at
+        ),
+        "corpus_versions": _advance_corpus_versions(store, article.corpus_versions, corpus, markdown),
+        "updated_at": updated_at,
+    })
+    return store.put(updated), diffs, decision
+
+
+# --- Détection des articles à rafraîchir -----------------------------------
+
+def load_corpus() -> Dict[str, str]:
+    return load_corpus_files(DATA_DIR)
+
+
+def snapshot_corpus(store: ArticleStore, corpus: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Empreinte de chaque fichier du corpus (versions conservées dans le store).
+
+    Passer le corpus effectivement envoyé au modèle : relire le disque plus
+    tard enregistrerait une version que l'article n'a peut-être pas vue.
+    """
+    corpus = load_corpus() if corpus is None else corpus
+    return {name: store.save_corpus_snapshot(text) for name, text in corpus.items()}
+
+
+def _advance_corpus_versions(
+    store: ArticleStore, versions: Dict[str, str], corpus: Dict[str, str], markdown: str
+) -> Dict[str, str]:
+    """Versions du corpus après un rafraîchissement partiel.
+
+    Un fichier passe à sa version actuelle sauf si l'article cite encore un
+    fait retiré de ce fichier (section non rafraîchie) : l'ancienne empreinte
+    est alors conservée pour que find_stale_articles le signale toujours.
+    """
+    advanced = snapshot_corpus(store, corpus)
+    text = _normalize(markdown)
+    for name, facts in _removed_facts_by_file(store, versions, corpus).items():
+        if facts and any(_contains(text, fact) for fact in facts):
+            advanced[name] = versions[name]
+    return advanced
+
+
+def _normalize(text: str) -> str:
+    text = _DIGIT_SPACES.sub("", plain_text(text))
+    return " ".join(text.split()).casefold()
+
+
+def _priced_lines(text: str) -> Counter:
+    """Prix rattachés à leur ligne : (titre, éléments de liste parents, libellé sans prix, prix)."""
+    priced: Counter = Counter()
+    heading = ""
+    parents: List[Tuple[int, str]] = []
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        title = HEADING.match(line)
+        if title:
+            heading, parents = _normalize(title.group(2)), []
+            continue
+        indent = len(line) - len(line.lstrip())
+        while parents and parents[-1][0] >= indent:
+            parents.pop()
+        label = _normalize(_PRICE.sub("", line))
+        for price in _PRICE.finditer(line):
+            priced[(heading, tuple(p for _, p in parents), label, _normalize(price.group(0)))] += 1
+        if _LIST_ITEM.match(line):
+            parents.append((indent, label))
+    return priced
+
+
+def removed_facts(old_text: str, new_text: str) -> List[str]:
+    """Prix et citations présents dans l'ancienne version d'un fichier mais plus dans la nouvelle.
+
+    Un prix est retiré dès que sa ligne (programme, libellé) ne l'affiche plus,
+    même si le même montant figure ailleurs dans le fichier pour une autre offre.
+    """
+    new_priced = _priced_lines(new_text)
+    facts: List[str] = []
+    for key, count in _priced_lines(old_text).items():
+        price = key[-1]
+        if price and price not in facts and new_priced[key] < count:
+            facts.append(price)
+
+    new_normalized = _normalize(new_text)
+    new_lines = set(new_text.split("\n"))
+    for line in old_text.split("\n"):
+        if line in new_lines:
+            continue
+        for quote in _QUOTED.finditer(line):
+            fact = _normalize(quote.group(1))
+            if fact and fact not in facts and not _contains(new_normalized, fact):
+                facts.append(fact)
+    return facts
+
+
+def _contains(normalized_text: str, fact: str) -> bool:
+    return re.search(rf"(?<![\w]){re.escape(fact)}", normalized_text) is not None
+
+
+def _removed_facts_by_file(
+    store: ArticleStore,
+    versions: Dict[str, str],
+    current: Dict[str, str],
+    changed_files: Optional[List[str]] = None,
+) -> Dict[str, Optional[List[str]]]:
+    """Faits retirés de chaque fichier modifié depuis `versions` (None : ancienne version introuvable)."""
+    by_file: Dict[str, Optional[List[str]]] = {}
+    for name, digest in versions.items():
+        if changed_files is not None and name not in changed_files:
+            continue
+        text = current.get(name, "")
+        if hashlib.sha256(text.encode("utf-8")).hexdigest() == digest:
+            continue
+        old_text = store.load_corpus_snapshot(digest)
+        by_file[name] = None if old_text is None else removed_facts(old_text, text)
+    return by_file
+
+
+def find_stale_articles(store: ArticleStore, changed_files: Optional[List[str]] = None) -> List[StaleArticle]:
+    """Articles qui citent un prix ou une phrase retirés des fichiers du corpus modifiés.
+
+    Sans `changed_files`, tous les fichiers dont l'empreinte a changé sont examinés.
+    """
+    current = load_corpus()
+
+    stale = []
+    for article in store.list():
+        by_file = _removed_facts_by_file(store, article.corpus_versions, current, changed_files)
+        changed = list(by_file)
+        facts = [fact for file_facts in by_file.values() for fact in file_facts or []]
+        unknown = any(file_facts is None for file_facts in by_file.values())
+
+        if not changed:
+            continue
+        sections = [
+            section.title or "(introduction)"
+            for section in split_sections(article.markdown)
+            if any(_contains(_normalize("\n".join(section.lines())), fact) for fact in facts)
+        ]
+        # Ancienne version introuvable : on ne peut pas exclure l'article
+        if sections or unknown:
+            stale.append(StaleArticle(
+                article_id=article.article_id,
+                subject=article.subject,
+                changed_files=changed,
+                sections=sections,
+            ))
+    return stale
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class TocEntry(BaseModel):
+    level: int = Field(description="Niveau du titre (1 à 6)")
+    title: str = Field(description="Texte du titre, sans balisage markdown")
+    anchor: str = Field(description="Ancre HTML (id) du titre dans le rendu")
+
+class SeoArtifacts(BaseModel):
+    title_candidates: List[str] = Field(description="Titres <title> proposés, du plus fidèle au plus court")
+    meta_description: str = Field(description="Meta description (155 caractères max)")
+    reading_time_minutes: int
+    word_count: int
+    json_ld: Dict[str, Any] = Field(description="Données structurées schema.org/BlogPosting")
+
+class BlogArtifacts(BaseModel):
+    html: str = Field(description="Rendu HTML assaini de l'article")
+    toc: List[TocEntry]
+    seo: SeoArtifacts
+
+class StoredArticle(BaseModel):
+    article_id: str
+    subject: str
+    markdown: str
+    created_at: str = Field(description="Date de génération (ISO 8601, UTC)")
+    model: str
+    scores: Dict[str, float]
+    sources: List[str]
+    artifacts: BlogArtifacts
+    corpus_versions: Dict[str, str] = Field(default_factory=dict, description="Empreinte sha256 de chaque fichier du corpus utilisé")
+    updated_at: Optional[str] = None
+    routing_reason: Optional[str] = None
+
+class SectionDiff(BaseModel):
+    title: str
+    anchor: str
+    before: str
+    after: str
+    diff: List[str] = Field(description="Diff unifié ligne à ligne (before -> after)")
+
+class StaleArticle(BaseModel):
+    article_id: str
+    subject: str
+    changed_files: List[str]
+    sections: List[str] = Field(description="Sections qui citent un élément retiré ou modifié du corpus")
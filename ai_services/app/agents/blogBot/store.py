@@ -0,0 +1,106 @@
+"""
+Stockage local des articles générés, avec leurs artefacts pré-calculés.
+
+Un fichier JSON par article dans `BLOG_STORAGE_DIR` (défaut : blogBot/storage/),
+et sous `corpus/` chaque version des fichiers du corpus ayant servi à générer
+un article (pour savoir, après une modification, quels articles rafraîchir).
+"""
+import hashlib
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from app.agents.blogBot.schemas import BlogArtifacts, StoredArticle
+
+
+STORAGE_DIR = Path(os.getenv("BLOG_STORAGE_DIR", Path(__file__).parent / "storage"))
+
+_ARTICLE_ID = re.compile(r"^[0-9a-f]{32}$")
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ArticleStore:
+    def __init__(self, root: Path = STORAGE_DIR):
+        self.root = Path(root)
+
+    def _path(self, article_id: str) -> Optional[Path]:
+        # L'identifiant sert de nom de fichier : on refuse tout autre format
+        if not _ARTICLE_ID.match(article_id):
+            return None
+        return self.root / f"{article_id}.json"
+
+    def save(
+        self,
+        subject: str,
+        markdown: str,
+        artifacts: BlogArtifacts,
+        model: str,
+        scores: dict,
+        sources: List[str],
+        corpus_versions: Optional[dict] = None,
+        routing_reason: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> StoredArticle:
+        article = StoredArticle(
+            article_id=uuid.uuid4().hex,
+            subject=subject,
+            markdown=markdown,
+            created_at=created_at or now_iso(),
+            model=model,
+            scores=scores,
+            sources=sources,
+            artifacts=artifacts,
+            corpus_versions=corpus_versions or {},
+            routing_reason=routing_reason,
+        )
+        return self.put(article)
+
+    def put(self, article: StoredArticle) -> StoredArticle:
+        """Écrit (ou remplace) un article ; écriture atomique via fichier temporaire."""
+        path = self._path(article.article_id)
+        if path is None:
+            raise ValueError(f"Identifiant d'article invalide: {article.article_id}")
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(article.model_dump_json(indent=2), encoding="utf-8")
+        tmp.replace(path)
+        return article
+
+    def get(self, article_id: str) -> Optional[StoredArticle]:
+        path = self._path(article_id)
+        if path is None or not path.is_file():
+            return None
+        return StoredArticle.model_validate_json(path.read_text(encoding="utf-8"))
+
+    def save_corpus_snapshot(self, text: str) -> str:
+        """Conserve une version d'un fichier du corpus ; renvoie son empreinte sha256."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = self.root / "corpus" / f"{digest}.txt"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        return digest
+
+    def load_corpus_snapshot(self, digest: str) -> Optional[str]:
+        if not _DIGEST.match(digest):
+            return None
+        path = self.root / "corpus" / f"{digest}.txt"
+        return path.read_text(encoding="utf-8") if path.is_file() else None
+
+    def list(self) -> List[StoredArticle]:
+        if not self.root.is_dir():
+            return []
+        return [
+            StoredArticle.model_validate_json(f.read_text(encoding="utf-8"))
+            for f in sorted(self.root.glob("*.json"))
+        ]
+
+
+article_store = ArticleStore()
@@ -0,0 +1,130 @@
+"""
+Scoring du quiz en masse pour les cohortes B2B (50 à 500 collaborateurs).
+
+Les jeux de réponses identiques (forme canonique) ne sont envoyés qu'une fois
+au modèle ; les autres tournent avec une concurrence bornée. Les résultats
+sont renvoyés dans l'ordre d'entrée, suivis d'un résumé de cohorte.
+
+Un lot déclenche jusqu'à QUIZ_BATCH_MAX_ITEMS appels modèle : l'endpoint exige
+le jeton QUIZ_BATCH_TOKEN (en-tête X-Batch-Token) et reste fermé sans lui.
+"""
+import asyncio
+import csv
+import io
+import os
+from collections import Counter
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from pydantic import TypeAdapter
+
+from app.agents.quiz.logic import canonicalize_answers, invoke_recommendation
+from app.agents.quiz.schemas import BatchQuizItem, RecommendationOutput
+from app.profiling import check_admin_token
+
+
+BATCH_TOKEN = os.getenv("QUIZ_BATCH_TOKEN", "")
+BATCH_MAX_ITEMS = int(os.getenv("QUIZ_BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("QUIZ_BATCH_CONCURRENCY", "8"))
+
+_ITEMS_ADAPTER = TypeAdapter(List[BatchQuizItem])
+
+
+class BatchInputError(ValueError):
+    """Cohorte illisible ou trop volumineuse."""
+
+
+def check_batch_token(token: Optional[str]) -> bool:
+    return check_admin_token(token, BATCH_TOKEN)
+
+
+def parse_batch_json(body: bytes) -> List[BatchQuizItem]:
+    """Tableau JSON de `{"id"?, "answers"}`."""
+    try:
+        items = _ITEMS_ADAPTER.validate_json(body)
+    except ValueError as e:
+        raise BatchInputError(f"JSON invalide: {str(e)}")
+    return _check_size(items)
+
+
+def parse_batch_csv(text: str) -> List[BatchQuizItem]:
+    """CSV avec une colonne `id` optionnelle et une colonne par question (q1..q10)."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    if not reader.fieldnames:
+        raise BatchInputError("CSV vide")
+
+    items = []
+    for row in reader:
+        row_id = (row.pop("id", None) or "").strip() or None
+        answers = {key.strip(): (value or "").strip() for key, value in row.items() if key and (value or "").strip()}
+        if answers:
+            items.append(BatchQuizItem(id=row_id, answers=answers))
+    return _check_size(items)
+
+
+def _check_size(items: List[BatchQuizItem]) -> List[BatchQuizItem]:
+    if not items:
+        raise BatchInputError("Aucun jeu de réponses")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise BatchInputError(f"Cohorte trop grande: {len(items)} > {BATCH_MAX_ITEMS}")
+    return items
+
+
+def _invoke_recommendation(answers: Dict[str, str]) -> RecommendationOutput:
+    return invoke_recommendation(answers)[0]
+
+
+async def stream_batch(
+    items: List[BatchQuizItem],
+    runner: Optional[Callable[[Dict[str, str]], RecommendationOutput]] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+) -> AsyncIterator[Dict]:
+    """Produit une ligne par collaborateur (dans l'ordre d'entrée), puis le résumé."""
+    runner = runner or _invoke_recommendation
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(answers: Dict[str, str]) -> RecommendationOutput:
+        async with semaphore:
+            return await asyncio.to_thread(runner, answers)
+
+    # Un seul appel par jeu de réponses canonique
+    tasks: Dict[tuple, asyncio.Task] = {}
+    keys = []
+    for item in items:
+        key = canonicalize_answers(item.answers)
+        if key not in tasks:
+            tasks[key] = asyncio.create_task(run(item.answers))
+        keys.append(key)
+
+    profiles: Counter = Counter()
+    programmes: Counter = Counter()
+    modules: Counter = Counter()
+    errors = 0
+
+    try:
+        for index, (item, key) in enumerate(zip(items, keys)):
+            line: Dict = {"type": "result", "index": index, "id": item.id}
+            try:
+                res = await tasks[key]
+            except Exception as e:
+                errors += 1
+                line["error"] = str(e)
+            else:
+                profiles[res.profil_letter] += 1
+                programmes[res.principal_program.name] += 1
+                modules.update(m.name for m in res.complementary_modules)
+                line["recommendation"] = res.model_dump()
+            yield line
+    finally:
+        # Client déconnecté : inutile de poursuivre les appels restants
+        for task in tasks.values():
+            task.cancel()
+
+    yield {
+        "type": "summary",
+        "total": len(items),
+        "unique_answer_sets": len(tasks),
+        "errors": errors,
+        "profile_distribution": dict(profiles.most_common()),
+        "programme_counts": dict(programmes.most_common()),
+        "complementary_module_counts": dict(modules.most_common()),
+    }
@@ -0,0 +1,173 @@
+"""
+Table du catalogue parsée depuis context.txt.
+
+En sortie compacte, le modèle ne renvoie que des identifiants courts (P1, A2,
+...) ; les noms exacts du catalogue sont réinjectés côté serveur, ce qui évite
+au modèle de les retaper en entier.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.agents.quiz.schemas import CompactRecommendation, FormationDetails, RecommendationOutput
+
+
+_SIGNATURE_SECTION = "=== PROGRAMMES SIGNATURE"
+_POLES_SECTION = "=== AUTRES PÔLES"
+_RULES_SECTION = "RÈGLES DE DÉCISION"
+_OUTPUT_SECTION = "INSTRUCTIONS DE SORTIE"
+
+_PROGRAMME = re.compile(r"^\d+\.\s+(.+?)\s+\(Pôle\s+([A-H])\)\s*$")
+_PROGRAMME_FOR = re.compile(r"^\s*-\s*Pour\s*:\s*(.+)$")
+_POLE = re.compile(r"^PÔLE\s+([A-H])\s*-\s*(.+?)(?:\s+\(Profil\s+[A-H]\))?\s*$")
+_ITEM = re.compile(r"^\s*-\s+(.+)$")
+_DETAIL = re.compile(r"^(.+?)\s*\((.+)\)\s*$")
+_RULE = re.compile(r"^\d+\.\s+DOMINANTE\s+([A-H])\b")
+_RULE_SIGNATURE = re.compile(r"Signature[^\"]*\"([^\"]+)\"")
+
+
+class CatalogueEntry:
+    def __init__(self, entry_id: str, name: str, pole: str, detail: str = ""):
+        self.id = entry_id
+        self.name = name
+        self.pole = pole
+        self.detail = detail
+
+
+class Catalogue:
+    def __init__(
+        self,
+        programmes: List[CatalogueEntry],
+        modules: List[CatalogueEntry],
+        programme_by_profile: Optional[Dict[str, str]] = None,
+    ):
+        self.programmes = programmes
+        self.modules = modules
+        # Lettre dominante -> identifiant du programme signature prioritaire
+        self.programme_by_profile = programme_by_profile or {}
+        self._by_id: Dict[str, CatalogueEntry] = {e.id: e for e in programmes + modules}
+
+    def get(self, entry_id: str) -> Optional[CatalogueEntry]:
+        return self._by_id.get((entry_id or "").strip().upper())
+
+    def programme_for_profile(self, letter: str) -> Optional[CatalogueEntry]:
+        entry = self.get(self.programme_by_profile.get((letter or "").strip().upper(), ""))
+        return entry or (self.programmes[0] if self.programmes else None)
+
+    def as_prompt_table(self) -> str:
+        lines = ["Programmes signature :"]
+        lines += [f"{p.id} = {p.name}" for p in self.programmes]
+        lines.append("Modules complémentaires :")
+        lines += [f"{m.id} = {m.name} (Pôle {m.pole})" for m in self.modules]
+        return "\n".join(lines)
+
+
+def parse_catalogue(text: str) -> Catalogue:
+    """
+    Extrait programmes signature (P1..), modules (A1, B2..) et, depuis les
+    règles de décision, le premier programme signature cité pour chaque
+    lettre dominante ("DOMINANTE D ... Signature "Prise de Parole"").
+    """
+    programmes: List[CatalogueEntry] = []
+    modules: List[CatalogueEntry] = []
+    programme_by_profile: Dict[str, str] = {}
+    rule = None
+    section = None
+    pole = None
+
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith(_SIGNATURE_SECTION):
+            section = "signature"
+            continue
+        if stripped.startswith(_POLES_SECTION):
+            section = "poles"
+            continue
+        if stripped.startswith(_RULES_SECTION):
+            section = "rules"
+            continue
+        if stripped.startswith(_OUTPUT_SECTION):
+            break
+
+        if section == "signature":
+            programme = _PROGRAMME.match(stripped)
+            if programme:
+                programmes.append(CatalogueEntry(f"P{len(programmes) + 1}", programme.group(1), programme.group(2)))
+                continue
+            detail = _PROGRAMME_FOR.match(line)
+            if detail and programmes:
+                programmes[-1].detail = detail.group(1).strip()
+
+        elif section == "poles":
+            header = _POLE.match(stripped)
+            if header:
+                pole = header.group(1)
+                continue
+            item = _ITEM.match(line)
+            if not item or pole is None:
+                continue
+            text_item = item.group(1).strip()
+            # Les programmes signature déjà listés et les simples notes "(...)" ne sont pas des modules
+            if text_item.startswith("(") or "(Signature)" in text_item:
+                continue
+            detail = _DETAIL.match(text_item)
+            name, extra = (detail.group(1), detail.group(2)) if detail else (text_item, "")
+            count = sum(1 for m in modules if m.pole == pole)
+            modules.append(CatalogueEntry(f"{pole}{count + 1}", name, pole, extra))
+
+        elif section == "rules":
+            header = _RULE.match(stripped)
+            if header:
+                rule = header.group(1)
+            if rule is None or rule in programme_by_profile:
+                continue
+            # Règles conditionnelles (D, E, F) : la première signature citée fait foi
+            for quoted in _RULE_SIGNATURE.findall(stripped):
+                programme = _programme_named(programmes, quoted)
+                if programme is not None:
+                    programme_by_profile[rule] = programme.id
+                    break
+
+    return Catalogue(programmes, modules, programme_by_profile)
+
+
+def _programme_named(programmes: List[CatalogueEntry], short_name: str) -> Optional[CatalogueEntry]:
+    # "Kizomba Bien-être" désigne "Kizomba Bien-Être & Connexion"
+    key = short_name.strip().casefold()
+    return next((p for p in programmes if p.name.casefold().startswith(key)), None)
+
+
+@lru_cache(maxsize=4)
+def _load_catalogue(path: str, mtime: float) -> Catalogue:
+    with open(path, "r") as f:
+        return parse_catalogue(f.read())
+
+
+def load_catalogue(context_path: str) -> Catalogue:
+    """Catalogue de context.txt, re-parsé seulement quand le fichier change."""
+    return _load_catalogue(context_path, os.path.getmtime(context_path))
+
+
+def expand_recommendation(compact: CompactRecommendation, catalogue: Catalogue) -> RecommendationOutput:
+    """Reconstruit la réponse complète à partir des identifiants renvoyés par le modèle."""
+    letter = compact.profil.strip().upper()[:1]
+
+    # Identifiant inconnu : on retombe sur le programme signature de la lettre dominante
+    programme = catalogue.get(compact.programme_id) or catalogue.programme_for_profile(letter)
+
+    modules = []
+    for index, module_id in enumerate(compact.module_ids):
+        entry = catalogue.get(module_id)
+        if entry is None or entry is programme or any(m.name == entry.name for m in modules):
+            continue
+        reason = compact.raisons_modules[index] if index < len(compact.raisons_modules) else ""
+        modules.append(FormationDetails(name=entry.name, reason=reason))
+
+    return RecommendationOutput(
+        profil_letter=letter,
+        profil_analysis=compact.analyse,
+        principal_program=FormationDetails(name=programme.name if programme else "", reason=compact.raison_programme),
+        complementary_modules=modules,
+        motivation_message=compact.motivation,
+    )
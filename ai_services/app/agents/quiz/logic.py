@@ -1,9 +1,66 @@
 import os
+import re
+from typing import Dict, Optional, Tuple
 from langchain_anthropic import ChatAnthropic
-from app.agents.quiz.schemas import RecommendationOutput  # On importe le schéma
+from app.agents.quiz.catalogue import expand_recommendation, load_catalogue
+from app.agents.quiz.schemas import CompactRecommendation, RecommendationOutput  # On importe le schéma
+from app.model_registry import RoutingDecision, model_router
 
 
-def get_quiz_chain():
+# Lettre de choix en tête de réponse : "B. Je manque de temps..." -> "B"
+ANSWER_LETTER = re.compile(r"^\s*([A-H])\s*[.)]")
+
+# "compact" : le modèle renvoie des identifiants du catalogue + phrases courtes,
+# étendus côté serveur ; "full" : le modèle rédige RecommendationOutput en entier.
+QUIZ_OUTPUT_MODE = os.getenv("QUIZ_OUTPUT_MODE", "compact")
+# Longueur max de chaque phrase en mode compact (le plafond de tokens est dans
+# le profil "quiz" du registre de modèles : compact_max_tokens)
+QUIZ_SENTENCE_MAX_WORDS = int(os.getenv("QUIZ_SENTENCE_MAX_WORDS", "25"))
+
+# Écart minimum entre 1re et 2e lettre pour qu'un profil soit jugé "net"
+QUIZ_CLEAR_PROFILE_MARGIN = int(os.getenv("QUIZ_CLEAR_PROFILE_MARGIN", "2"))
+
+_OUTPUT_INSTRUCTIONS = "INSTRUCTIONS DE SORTIE"
+
+
+def is_compact_mode() -> bool:
+    return QUIZ_OUTPUT_MODE == "compact"
+
+
+def estimate_profile(answers: Dict[str, str]) -> Tuple[Optional[str], Dict[str, int]]:
+    """Compte les lettres des réponses ("B. ...") et renvoie (lettre dominante, comptes).
+
+    En cas d'égalité, la lettre la plus petite dans l'ordre alphabétique l'emporte
+    pour que l'estimation reste déterministe.
+    """
+    counts: Dict[str, int] = {}
+    for value in answers.values():
+        match = ANSWER_LETTER.match(value or "")
+        if match:
+            letter = match.group(1)
+            counts[letter] = counts.get(letter, 0) + 1
+
+    if not counts:
+        return None, counts
+
+    dominant = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[0][0]
+    return dominant, counts
+
+
+def quiz_complexity(answers: Dict[str, str]) -> Tuple[str, str]:
+    """Niveau de complexité pour le routage : "simple" si un profil domine nettement, sinon "complex"."""
+    dominant, counts = estimate_profile(answers)
+    if dominant is None:
+        return "complex", "profil indéterminé"
+
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    margin = ordered[0][1] - (ordered[1][1] if len(ordered) > 1 else 0)
+    if margin >= QUIZ_CLEAR_PROFILE_MARGIN:
+        return "simple", f"profil net ({dominant}, écart {margin})"
+    return "complex", f"profil mixte ({ordered[0][0]}/{ordered[1][0]}, écart {margin})"
+
+
+def get_quiz_chain(include_raw: bool = False, compact: bool = False, decision: Optional[RoutingDecision] = None):
     target_path = os.path.join(os.path.dirname(__file__), "context.txt")
 
     # Check if context.txt exists at the target path
@@ -13,13 +70,97 @@ def get_quiz_chain():
         # Fallback to current directory if not found
         system_context_path = "./context.txt"
 
+    # Modèle, température et max_tokens viennent du profil "quiz" du registre
+    decision = decision or model_router.route("quiz")
     model = ChatAnthropic(
-        model="claude-haiku-4-5-20251001",
+        model=decision.model_id,
         api_key=os.getenv("ANTHROPIC_API_KEY"),
-        temperature=0,
-        max_tokens=2048,
+        temperature=decision.temperature,
+        max_tokens=decision.compact_max_tokens if compact else decision.max_tokens,
     )
 
-    chain = model.with_structured_output(RecommendationOutput)
+    # include_raw=True renvoie {"raw", "parsed", "parsing_error"} : utile pour
+    # lire usage_metadata (tokens consommés) en plus de la sortie structurée.
+    schema = CompactRecommendation if compact else RecommendationOutput
+    chain = model.with_structured_output(schema, include_raw=include_raw)
 
     return chain, system_context_path
+
+
+def build_quiz_prompt(context_path: str, answers: Dict[str, str], compact: bool = False) -> str:
+    """Assemble le prompt final : contexte catalogue + réponses du candidat."""
+    # Read context file content
+    try:
+        with open(context_path, "r") as f:
+            system_prompt = f.read()
+    except FileNotFoundError:
+        system_prompt = ""
+
+    if compact and system_prompt:
+        system_prompt = _compact_system_prompt(system_prompt, context_path)
+
+    answers_text = "\n".join([f"{key}:{value}" for key, value in answers.items()])
+
+    return f"{system_prompt}\n\nVoici Les Reponses du candidat:\n{answers_text}"
+
+
+def _compact_system_prompt(system_prompt: str, context_path: str) -> str:
+    # Les consignes de sortie JSON complètes de context.txt sont remplacées par
+    # la table d'identifiants et le budget de longueur.
+    base = system_prompt.split(_OUTPUT_INSTRUCTIONS)[0].rstrip()
+    table = load_catalogue(context_path).as_prompt_table()
+    return (
+        f"{base}\n\n"
+        f"IDENTIFIANTS DU CATALOGUE :\n{table}\n\n"
+        "INSTRUCTIONS DE SORTIE (FORMAT COMPACT) :\n"
+        "- Utilise UNIQUEMENT les identifiants ci-dessus (programme_id, module_ids), jamais les noms.\n"
+        "- Choisis 1 ou 2 modules complémentaires.\n"
+        f"- Chaque texte est UNE phrase personnalisée de {QUIZ_SENTENCE_MAX_WORDS} mots maximum, "
+        "sans markdown, sans répéter le nom de la formation."
+    )
+
+
+def invoke_recommendation(
+    answers: Dict[str, str], compact: Optional[bool] = None
+) -> Tuple[RecommendationOutput, Dict, RoutingDecision]:
+    """Appel modèle complet ; renvoie (RecommendationOutput, usage_metadata, choix du modèle).
+
+    Le modèle est choisi par le routeur selon la netteté du profil ; en mode
+    compact, la sortie est étendue avec les noms exacts du catalogue.
+    """
+    if compact is None:
+        compact = is_compact_mode()
+
+    complexity, signal = quiz_complexity(answers)
+    decision = model_router.route("quiz", complexity, signal)
+
+    chain, context_path = get_quiz_chain(include_raw=True, compact=compact, decision=decision)
+    with model_router.track(decision):
+        res = chain.invoke(build_quiz_prompt(context_path, answers, compact=compact))
+        if res.get("parsing_error") is not None:
+            raise res["parsing_error"]
+
+    parsed = res["parsed"]
+    if compact:
+        parsed = expand_recommendation(parsed, load_catalogue(context_path))
+
+    usage = getattr(res.get("raw"), "usage_metadata", None) or {}
+    return parsed, usage, decision
+
+
+def canonicalize_answers(answers: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Forme canonique d'un jeu de réponses, pour reconnaître deux quiz identiques.
+
+    Questions triées dans l'ordre naturel (q2 avant q10) ; chaque réponse est
+    réduite à sa lettre de choix, ou à son texte normalisé si elle n'en a pas.
+    """
+    def question_order(key: str):
+        digits = re.sub(r"\D", "", key)
+        return (int(digits) if digits else 0, key)
+
+    canonical = []
+    for key in sorted(answers, key=question_order):
+        value = answers[key] or ""
+        match = ANSWER_LETTER.match(value)
+        canonical.append((key.strip().lower(), match.group(1) if match else " ".join(value.split()).casefold()))
+    return tuple(canonical)
@@ -0,0 +1,199 @@
+"""
+Journal compact des motifs de réponses au quiz.
+
+Chaque soumission est réduite à sa forme canonique (une lettre A-H par
+question q1..q10), codée sur 4 bits par question, et ajoutée à un fichier en
+ajout seul sous forme d'enregistrements de taille fixe (10 octets) :
+
+    uint32 horodatage (s) | uint8 version | 5 octets = 10 quartets (0 = sans réponse, 1..8 = A..H)
+
+Le fichier tourne au-delà de `QUIZ_PATTERN_LOG_MAX_BYTES`. Pour pouvoir
+pré-calculer une recommandation plus tard, un jeu de réponses complet est
+conservé une seule fois par motif distinct (fichier d'exemplaires), dans la
+limite de `QUIZ_PATTERN_EXEMPLARS_MAX` motifs. Après une rotation ou quand la
+limite est atteinte, le fichier est compacté en arrière-plan (relecture du
+journal hors du chemin de la requête) : seuls les motifs encore présents dans
+le journal sont gardés, les plus fréquents d'abord.
+"""
+import json
+import os
+import re
+import struct
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.agents.quiz.logic import ANSWER_LETTER
+
+
+QUESTION_COUNT = 10
+RECORD = struct.Struct(">IB5s")  # 10 octets
+RECORD_VERSION = 1
+
+STORAGE_DIR = Path(os.getenv("QUIZ_STORAGE_DIR", Path(__file__).parent / "storage"))
+LOG_MAX_BYTES = int(os.getenv("QUIZ_PATTERN_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("QUIZ_PATTERN_LOG_BACKUPS", "5"))
+EXEMPLARS_MAX = int(os.getenv("QUIZ_PATTERN_EXEMPLARS_MAX", "10000"))
+
+_QUESTION_NUMBER = re.compile(r"^\s*q(\d+)\s*$", re.IGNORECASE)
+
+
+def encode_pattern(answers: Dict[str, str]) -> Optional[str]:
+    """Motif canonique sur 10 caractères hexa (un par question), ou None si non codable.
+
+    Seuls les quiz dont chaque réponse est une lettre A-H sur q1..q10 sont
+    codés : une réponse libre rendrait deux quiz différents indiscernables.
+    """
+    nibbles = [0] * QUESTION_COUNT
+    for key, value in answers.items():
+        number = _QUESTION_NUMBER.match(key)
+        letter = ANSWER_LETTER.match(value or "")
+        if not number or not letter or not 1 <= int(number.group(1)) <= QUESTION_COUNT:
+            return None
+        nibbles[int(number.group(1)) - 1] = ord(letter.group(1)) - ord("A") + 1
+    if not any(nibbles):
+        return None
+    return "".join(f"{n:x}" for n in nibbles)
+
+
+def decode_pattern(pattern: str) -> Dict[str, str]:
+    """Lettres par question d'un motif ("2220000000" -> {"q1": "B", "q2": "B", "q3": "B"})."""
+    return {
+        f"q{i}": chr(ord("A") + int(c, 16) - 1)
+        for i, c in enumerate(pattern, 1)
+        if c != "0"
+    }
+
+
+class PatternLog:
+    def __init__(
+        self,
+        root: Path = STORAGE_DIR,
+        max_bytes: int = LOG_MAX_BYTES,
+        backups: int = LOG_BACKUPS,
+        max_exemplars: int = EXEMPLARS_MAX,
+    ):
+        self.root = Path(root)
+        self.path = self.root / "patterns.log"
+        self.exemplars_path = self.root / "patterns.exemplars.jsonl"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_exemplars = max_exemplars
+        self._lock = threading.Lock()
+        self._known: Optional[set] = None
+        self._compacting = False
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def append(self, answers: Dict[str, str], timestamp: Optional[float] = None) -> Optional[str]:
+        """Ajoute une soumission au journal ; renvoie son motif (None si non codable)."""
+        pattern = encode_pattern(answers)
+        if pattern is None:
+            return None
+
+        record = RECORD.pack(int(timestamp or time.time()), RECORD_VERSION, bytes.fromhex(pattern))
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size + RECORD.size > self.max_bytes:
+                self._rotate()
+                # Les motifs sortis du journal n'ont plus d'exemplaire à garder
+                self._schedule_compaction()
+            with open(self.path, "ab") as f:
+                f.write(record)
+            self._remember_exemplar(pattern, answers)
+        return pattern
+
+    def _rotate(self) -> None:
+        # patterns.log -> .1 -> .2 ... ; le plus ancien au-delà de `backups` est supprimé
+        for index in range(self.backups, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if not source.exists():
+                continue
+            if index == self.backups:
+                source.unlink()
+            else:
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def _remember_exemplar(self, pattern: str, answers: Dict[str, str]) -> None:
+        if self._known is None:
+            self._known = set(self.load_exemplars())
+        if pattern in self._known:
+            return
+        if len(self._known) >= self.max_exemplars:
+            # Plafond atteint : motif ignoré jusqu'au prochain compactage
+            self._schedule_compaction()
+            return
+        self._known.add(pattern)
+        with open(self.exemplars_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"pattern": pattern, "answers": answers}, ensure_ascii=False) + "\n")
+
+    def _schedule_compaction(self) -> None:
+        # Appelé sous self._lock : un seul compactage à la fois
+        if self._compacting:
+            return
+        self._compacting = True
+        self._compaction_thread = threading.Thread(target=self._compact_exemplars, daemon=True)
+        self._compaction_thread.start()
+
+    def _compact_exemplars(self) -> int:
+        """Ne garde que les exemplaires des motifs encore journalisés ; renvoie le nombre gardé.
+
+        La moitié de la limite seulement est conservée (les plus fréquents), pour
+        laisser de la place aux nouveaux motifs jusqu'au compactage suivant.
+        """
+        try:
+            with self._lock:
+                started_with = set(self._known) if self._known is not None else set(self.load_exemplars())
+            # Relecture complète du journal, hors verrou : les ajouts continuent pendant ce temps
+            ranked = [p for p, _ in self.frequencies().most_common()]
+
+            with self._lock:
+                exemplars = self.load_exemplars()
+                kept = [p for p in ranked if p in exemplars][: self.max_exemplars // 2]
+                # Motifs apparus pendant la relecture : absents du classement mais récents
+                kept += [p for p in exemplars if p not in started_with and p not in kept]
+                tmp_path = self.exemplars_path.with_name(self.exemplars_path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for pattern in kept:
+                        f.write(json.dumps({"pattern": pattern, "answers": exemplars[pattern]}, ensure_ascii=False) + "\n")
+                tmp_path.replace(self.exemplars_path)
+                self._known = set(kept)
+                return len(kept)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def load_exemplars(self) -> Dict[str, Dict[str, str]]:
+        exemplars: Dict[str, Dict[str, str]] = {}
+        if not self.exemplars_path.exists():
+            return exemplars
+        with open(self.exemplars_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    exemplars.setdefault(entry["pattern"], entry["answers"])
+        return exemplars
+
+    def iter_records(self) -> Iterator[Tuple[int, str]]:
+        """(horodatage, motif) de tous les fichiers du journal, du plus ancien au plus récent."""
+        files = [self.path.with_name(f"{self.path.name}.{i}") for i in range(self.backups, 0, -1)] + [self.path]
+        for path in files:
+            if not path.exists():
+                continue
+            data = path.read_bytes()
+            # Un enregistrement tronqué (arrêt brutal) en fin de fichier est ignoré
+            usable = len(data) - len(data) % RECORD.size
+            for timestamp, version, packed in RECORD.iter_unpack(data[:usable]):
+                if version == RECORD_VERSION:
+                    yield timestamp, packed.hex()
+
+    def frequencies(self, since: Optional[float] = None) -> Counter:
+        return Counter(pattern for timestamp, pattern in self.iter_records() if since is None or timestamp >= since)
+
+
+pattern_log = PatternLog()
@@ -0,0 +1,90 @@
+"""
+Job hors-ligne de pré-chauffage du cache de recommandations.
+
+    python -m app.agents.quiz.prewarm [--top 50] [--days 30] [--force]
+
+Agrège le journal des motifs en fréquences, puis pré-calcule les
+recommandations des N motifs les plus fréquents. Sans --force, le job ne
+tourne que pendant la fenêtre creuse `QUIZ_PREWARM_HOURS` (heure locale,
+"2-6" par défaut) : à lancer depuis un cron horaire.
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Chargé avant les modules applicatifs, qui lisent leur configuration à l'import
+load_dotenv()
+
+from app.agents.quiz.pattern_log import PatternLog, decode_pattern, pattern_log
+from app.agents.quiz.warm_cache import WarmCache, warm_cache
+
+
+PREWARM_TOP_N = int(os.getenv("QUIZ_PREWARM_TOP_N", "50"))
+PREWARM_HOURS = os.getenv("QUIZ_PREWARM_HOURS", "2-6")
+
+
+def in_off_peak_window(hour: int, window: str = PREWARM_HOURS) -> bool:
+    """"2-6" = de 2h à 6h exclu ; une fenêtre comme "22-4" passe minuit."""
+    start, end = (int(part) for part in window.split("-"))
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def select_patterns(
+    log: PatternLog, top_n: int, since: Optional[float] = None
+) -> List[Tuple[str, Dict[str, str], int]]:
+    """(motif, réponses d'exemple, fréquence) des N motifs les plus fréquents disposant d'un exemplaire."""
+    exemplars = log.load_exemplars()
+    selected = []
+    for pattern, count in log.frequencies(since).most_common():
+        if pattern in exemplars:
+            selected.append((pattern, exemplars[pattern], count))
+        if len(selected) >= top_n:
+            break
+    return selected
+
+
+def run(log: PatternLog, cache: WarmCache, top_n: int, since: Optional[float] = None) -> Dict:
+    frequencies = log.frequencies(since)
+    total = sum(frequencies.values())
+    items = select_patterns(log, top_n, since)
+    covered = sum(count for _, _, count in items)
+
+    print(f"🔥 Pré-chauffage de {len(items)} motifs ({covered}/{total} soumissions couvertes)")
+    for pattern, _, count in items[:10]:
+        letters = "".join(decode_pattern(pattern).values())
+        print(f"   {pattern} ({letters}) x{count}")
+
+    written = cache.warm(items)
+    return {
+        "patterns": len(items),
+        "written": written,
+        "submissions": total,
+        "coverage": covered / total if total else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pré-chauffe le cache de recommandations du quiz")
+    parser.add_argument("--top", type=int, default=PREWARM_TOP_N, help="nombre de motifs à pré-calculer")
+    parser.add_argument("--days", type=float, default=None, help="ne compter que les N derniers jours")
+    parser.add_argument("--force", action="store_true", help="ignorer la fenêtre creuse")
+    args = parser.parse_args(argv)
+
+    if not args.force and not in_off_peak_window(datetime.now().hour):
+        print(f"⏸️ Hors fenêtre creuse ({PREWARM_HOURS}h), rien à faire")
+        return 0
+
+    since = time.time() - args.days * 86400 if args.days else None
+    summary = run(pattern_log, warm_cache, args.top, since)
+    print(f"✅ {summary['written']} recommandations en cache (couverture {summary['coverage']:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
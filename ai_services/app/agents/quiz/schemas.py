@@ -1,8 +1,19 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class QuizInput(BaseModel):
     answers: Dict[str, str]
+    session_id: Optional[str] = Field(default=None, description="Identifiant de session du quiz, pour réutiliser une recommandation spéculative")
+
+class PartialQuizInput(BaseModel):
+    answers: Dict[str, str]
+    session_id: Optional[str] = Field(default=None, description="Identifiant de session ; généré par le serveur au premier envoi s'il est absent")
+
+class SpeculationStatus(BaseModel):
+    session_id: str
+    estimated_profile: Optional[str] = Field(description="Lettre dominante estimée localement à partir des réponses partielles")
+    stable: bool = Field(description="Vrai si le profil dominant ne peut plus raisonnablement changer")
+    speculating: bool = Field(description="Vrai si une recommandation spéculative est en cours ou prête pour ce profil")
 
 class FormationDetails(BaseModel):
     name : str = Field(description="Le nom exacte de la formation recommandée issue du catalogue")
@@ -14,4 +25,17 @@ class RecommendationOutput(BaseModel):
     principal_program: FormationDetails = Field(description="La formation signature prioritaire (ex: Prise de Parole)")
     complementary_modules: List[FormationDetails] = Field(description="Liste de 1 ou 2 modules complémentaires pertinents")
     motivation_message: str = Field(description="Une phrase de fin inspirante et bienveillante")
-        
\ No newline at end of file
+
+class CompactRecommendation(BaseModel):
+    """Sortie compacte du modèle, étendue côté serveur en RecommendationOutput."""
+    profil: str = Field(description="Lettre du profil dominant (A à H)")
+    programme_id: str = Field(description="Identifiant du programme signature dans le catalogue (ex: P1)")
+    module_ids: List[str] = Field(description="1 ou 2 identifiants de modules complémentaires (ex: C2)")
+    analyse: str = Field(description="Une phrase courte de synthèse du profil, sans markdown")
+    raison_programme: str = Field(description="Une phrase courte et personnalisée : pourquoi ce programme")
+    raisons_modules: List[str] = Field(description="Une phrase courte par module, dans le même ordre que module_ids")
+    motivation: str = Field(description="Une phrase finale inspirante, courte")
+        
+class BatchQuizItem(BaseModel):
+    id: Optional[str] = Field(default=None, description="Identifiant libre du collaborateur (matricule, email...)")
+    answers: Dict[str, str]
@@ -0,0 +1,203 @@
+"""
+Recommandation spéculative du quiz à partir de réponses partielles.
+
+Le profil dominant est souvent évident bien avant q10 : dès que l'estimation
+locale (comptage des lettres A-H) est stable, on lance l'appel au modèle en
+arrière-plan. Au submit final, on réutilise ce résultat si la lettre dominante
+n'a pas changé ; sinon on l'abandonne et on relance un appel frais.
+"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from app.agents.quiz.logic import estimate_profile, invoke_recommendation
+from app.agents.quiz.schemas import RecommendationOutput
+from app.model_registry import RoutingDecision
+
+
+TOTAL_QUESTIONS = 10
+# Nombre minimum de réponses et écart minimum entre 1re et 2e lettre pour
+# considérer l'estimation stable (hors cas où l'écart est déjà irrattrapable).
+MIN_ANSWERS = int(os.getenv("QUIZ_SPECULATION_MIN_ANSWERS", "5"))
+MIN_MARGIN = int(os.getenv("QUIZ_SPECULATION_MIN_MARGIN", "2"))
+SESSION_TTL_SECONDS = int(os.getenv("QUIZ_SPECULATION_TTL_SECONDS", "1800"))
+MAX_WORKERS = int(os.getenv("QUIZ_SPECULATION_WORKERS", "4"))
+
+
+def is_profile_stable(answers: Dict[str, str]) -> bool:
+    """Vrai si la lettre dominante ne devrait plus changer d'ici la fin du quiz."""
+    dominant, counts = estimate_profile(answers)
+    if dominant is None:
+        return False
+
+    ordered = sorted(counts.values(), reverse=True)
+    margin = ordered[0] - (ordered[1] if len(ordered) > 1 else 0)
+    remaining = max(TOTAL_QUESTIONS - len(answers), 0)
+
+    # Écart irrattrapable : même toutes les réponses restantes ne suffiraient pas
+    if margin > remaining:
+        return True
+    return len(answers) >= MIN_ANSWERS and margin >= MIN_MARGIN
+
+
+# (sortie, usage_metadata, choix du modèle), comme invoke_recommendation
+SpeculationResult = Tuple[RecommendationOutput, Dict, Optional[RoutingDecision]]
+
+
+class _Speculation:
+    def __init__(self, profile: str, future: Future):
+        self.profile = profile
+        self.future = future
+
+
+class _Session:
+    def __init__(self):
+        self.touched_at = time.monotonic()
+        self.speculation: Optional[_Speculation] = None
+
+
+class SpeculationManager:
+    """Sessions de quiz en cours et recommandations spéculatives associées.
+
+    L'état est en mémoire (un seul process uvicorn) : une session perdue n'est
+    qu'un raté de spéculation, le submit final retombe sur un appel normal.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, str]], SpeculationResult] = invoke_recommendation,
+        max_workers: int = MAX_WORKERS,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+    ):
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quiz-spec")
+        self._ttl = ttl_seconds
+        self._sessions: Dict[str, _Session] = {}
+        # RLock : add_done_callback exécute le callback immédiatement (sous le
+        # verrou) si l'appel est déjà terminé.
+        self._lock = threading.RLock()
+        self._stats = {
+            "started": 0,
+            "hits": 0,
+            "misses": 0,
+            "cancelled_before_start": 0,
+            # Sessions clôturées sans consulter la spéculation (réponse servie par le cache pré-chauffé)
+            "superseded": 0,
+            "errors": 0,
+            "wasted_input_tokens": 0,
+            "wasted_output_tokens": 0,
+        }
+
+    def submit_partial(self, session_id: Optional[str], answers: Dict[str, str]) -> Dict:
+        """Enregistre des réponses partielles et lance la spéculation si le profil est stable."""
+        session_id = session_id or uuid.uuid4().hex
+        dominant, _ = estimate_profile(answers)
+        stable = is_profile_stable(answers)
+
+        with self._lock:
+            self._purge_expired()
+            session = self._sessions.setdefault(session_id, _Session())
+            session.touched_at = time.monotonic()
+
+            current = session.speculation
+            if current is not None and current.profile != dominant:
+                # Le profil a basculé : l'appel en cours ne servira plus
+                self._discard(current)
+                session.speculation = current = None
+
+            if stable and current is None:
+                future = self._executor.submit(self._runner, dict(answers))
+                session.speculation = _Speculation(dominant, future)
+                self._stats["started"] += 1
+
+            speculating = session.speculation is not None
+
+        return {
+            "session_id": session_id,
+            "estimated_profile": dominant,
+            "stable": stable,
+            "speculating": speculating,
+        }
+
+    async def resolve(self, session_id: Optional[str], answers: Dict[str, str]) -> Optional[SpeculationResult]:
+        """Au submit final : renvoie la recommandation spéculative si elle est réutilisable, sinon None."""
+        if not session_id:
+            return None
+
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            speculation = session.speculation if session else None
+            if speculation is None:
+                return None
+
+            dominant, _ = estimate_profile(answers)
+            if speculation.profile != dominant:
+                self._stats["misses"] += 1
+                self._discard(speculation)
+                return None
+
+        try:
+            result = await asyncio.wrap_future(speculation.future)
+        except Exception as e:
+            print(f"⚠️ Spéculation quiz en échec, appel frais: {str(e)}")
+            with self._lock:
+                self._stats["errors"] += 1
+                self._stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self._stats["hits"] += 1
+        return result
+
+    def discard(self, session_id: Optional[str]) -> None:
+        """Clôt une session dont la réponse finale a été servie autrement (cache pré-chauffé)."""
+        if not session_id:
+            return
+
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None or session.speculation is None:
+                return
+            self._stats["superseded"] += 1
+            self._discard(session.speculation)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active_sessions"] = len(self._sessions)
+
+        resolved = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / resolved if resolved else 0.0
+        stats["wasted_tokens"] = stats["wasted_input_tokens"] + stats["wasted_output_tokens"]
+        return stats
+
+    def _discard(self, speculation: _Speculation) -> None:
+        """Annule une spéculation ; si l'appel est déjà parti, ses tokens sont comptés comme gaspillés."""
+        if speculation.future.cancel():
+            self._stats["cancelled_before_start"] += 1
+            return
+        speculation.future.add_done_callback(self._count_wasted)
+
+    def _count_wasted(self, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, usage, _ = future.result()
+        with self._lock:
+            self._stats["wasted_input_tokens"] += usage.get("input_tokens", 0)
+            self._stats["wasted_output_tokens"] += usage.get("output_tokens", 0)
+
+    def _purge_expired(self) -> None:
+        # Appelé sous self._lock : les quiz abandonnés gaspillent leur spéculation
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if now - s.touched_at > self._ttl]
+        for sid in expired:
+            session = self._sessions.pop(sid)
+            if session.speculation is not None:
+                self._discard(session.speculation)
+
+
+speculation_manager = SpeculationManager()
@@ -0,0 +1,160 @@
+"""
+Cache de recommandations pré-calculées pour les motifs de réponses fréquents.
+
+Les entrées sont produites hors des heures de pointe par le job de
+pré-chauffage (`python -m app.agents.quiz.prewarm`) et servies directement par
+`/api/recommander`. Elles sont liées à l'empreinte de context.txt : si le
+catalogue change, elles ne sont plus servies et sont recalculées en
+arrière-plan pour les mêmes motifs.
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.agents.quiz.logic import invoke_recommendation
+from app.agents.quiz.pattern_log import STORAGE_DIR, encode_pattern
+from app.agents.quiz.schemas import RecommendationOutput
+
+
+WARM_WORKERS = int(os.getenv("QUIZ_PREWARM_WORKERS", "4"))
+REWARM_ON_CONTEXT_CHANGE = os.getenv("QUIZ_REWARM_ON_CONTEXT_CHANGE", "1") == "1"
+
+
+def _run(answers: Dict[str, str]) -> RecommendationOutput:
+    return invoke_recommendation(answers)[0]
+
+
+class WarmCache:
+    def __init__(
+        self,
+        path: Path = STORAGE_DIR / "warm_cache.json",
+        context_path: Optional[str] = None,
+        runner: Callable[[Dict[str, str]], RecommendationOutput] = _run,
+        workers: int = WARM_WORKERS,
+        rewarm_on_context_change: bool = REWARM_ON_CONTEXT_CHANGE,
+    ):
+        self.path = Path(path)
+        self.context_path = context_path or os.path.join(os.path.dirname(__file__), "context.txt")
+        self._runner = runner
+        self._workers = workers
+        self._rewarm_on_context_change = rewarm_on_context_change
+        self._lock = threading.Lock()
+        self._file_mtime: Optional[float] = None
+        self._context_mtime: Optional[float] = None
+        self._context_digest = ""
+        self._data: Dict = {"context_digest": "", "entries": {}}
+        self._rewarming_for: Optional[str] = None
+        self._rewarm_thread: Optional[threading.Thread] = None
+
+    # --- Lecture ----------------------------------------------------------
+
+    def context_digest(self) -> str:
+        """Empreinte de context.txt, recalculée seulement quand le fichier change."""
+        try:
+            mtime = os.path.getmtime(self.context_path)
+        except OSError:
+            return ""
+        if mtime != self._context_mtime:
+            with open(self.context_path, "rb") as f:
+                self._context_digest = hashlib.sha256(f.read()).hexdigest()
+            self._context_mtime = mtime
+        return self._context_digest
+
+    def _reload(self) -> None:
+        # Le job de pré-chauffage tourne dans un autre process : on relit le fichier s'il a changé
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime != self._file_mtime:
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._file_mtime = mtime
+
+    def get(self, answers: Dict[str, str]) -> Optional[RecommendationOutput]:
+        pattern = encode_pattern(answers)
+        if pattern is None:
+            return None
+
+        with self._lock:
+            self._reload()
+            digest = self.context_digest()
+            if self._data.get("context_digest") != digest:
+                self._schedule_rewarm(digest)
+                return None
+            entry = self._data["entries"].get(pattern)
+
+        return RecommendationOutput.model_validate(entry["recommendation"]) if entry else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._reload()
+            return {
+                "entries": len(self._data.get("entries", {})),
+                "context_up_to_date": self._data.get("context_digest") == self.context_digest(),
+                "rewarming": self._rewarming_for is not None,
+            }
+
+    # --- Pré-chauffage ----------------------------------------------------
+
+    def warm(self, items: List[Tuple[str, Dict[str, str], int]]) -> int:
+        """Calcule et enregistre les recommandations de (motif, réponses, fréquence) ; renvoie le nb d'entrées écrites."""
+        digest = self.context_digest()
+        results: Dict[str, Dict] = {}
+
+        def run(item):
+            pattern, answers, count = item
+            try:
+                res = self._runner(answers)
+            except Exception as e:
+                print(f"⚠️ Pré-chauffage du motif {pattern} en échec: {str(e)}")
+                return
+            results[pattern] = {
+                "recommendation": res.model_dump(),
+                "answers": answers,
+                "count": count,
+                "warmed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            list(executor.map(run, items))
+
+        with self._lock:
+            self._reload()
+            entries = self._data.get("entries", {}) if self._data.get("context_digest") == digest else {}
+            entries.update(results)
+            self._write({"context_digest": digest, "entries": entries})
+        return len(results)
+
+    def _write(self, data: Dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        self._data = data
+        self._file_mtime = self.path.stat().st_mtime
+
+    def _schedule_rewarm(self, digest: str) -> None:
+        # Appelé sous self._lock : un seul re-chauffage par nouvelle version de context.txt
+        entries = self._data.get("entries", {})
+        if not self._rewarm_on_context_change or not entries or self._rewarming_for == digest:
+            return
+        self._rewarming_for = digest
+        items = [(pattern, entry["answers"], entry.get("count", 0)) for pattern, entry in entries.items()]
+        print(f"🔥 context.txt modifié : re-chauffage de {len(items)} motifs")
+        self._rewarm_thread = threading.Thread(target=self._rewarm, args=(items,), daemon=True)
+        self._rewarm_thread.start()
+
+    def _rewarm(self, items) -> None:
+        try:
+            self.warm(items)
+        finally:
+            with self._lock:
+                self._rewarming_for = None
+
+
+warm_cache = WarmCache()
@@ -1,19 +1,39 @@
+import json
+import unicodedata
+
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
-from app.agents.quiz.logic import get_quiz_chain
-from app.agents.quiz.schemas import QuizInput, RecommendationOutput
+# Chargé avant les modules applicatifs, qui lisent leur configuration à l'import
+load_dotenv()
 
+from app.agents.blogBot.artifacts import build_artifacts
+from app.agents.blogBot.schemas import SectionDiff, SeoArtifacts, StaleArticle, StoredArticle, TocEntry
+from app.agents.blogBot.store import article_store, now_iso
+from app.agents.quiz.batch import BatchInputError, check_batch_token, parse_batch_csv, parse_batch_json, stream_batch
+from app.agents.quiz.logic import invoke_recommendation
+from app.agents.quiz.pattern_log import pattern_log
+from app.agents.quiz.schemas import PartialQuizInput, QuizInput, RecommendationOutput, SpeculationStatus
+from app.agents.quiz.speculation import speculation_manager
+from app.agents.quiz.warm_cache import warm_cache
+from app.model_registry import model_router
+from app.profiling import check_admin_token, install_profiling, list_profiles, resolve_profile_path
 
-load_dotenv()
 
 # Schemas pour le Blog
 class BlogRequest(BaseModel):
     subject: str
 
+class SectionRefreshRequest(BaseModel):
+    sections: List[str]
+
+class StaleArticlesRequest(BaseModel):
+    changed_files: Optional[List[str]] = None
+
 class ExpertiseScores(BaseModel):
     adn_cozetik: float
     expertise_tech: float
@@ -26,6 +46,57 @@ class BlogResponse(BaseModel):
     markdown: str
     expertise_report: ExpertiseScores
     sources: List[str]
+    article_id: Optional[str] = None
+    # Modèle choisi par le routeur et raison du choix
+    model: Optional[str] = None
+    routing_reason: Optional[str] = None
+    # Artefacts pré-calculés, renvoyés uniquement si demandés via ?include=
+    html: Optional[str] = None
+    toc: Optional[List[TocEntry]] = None
+    seo: Optional[SeoArtifacts] = None
+
+class SectionRefreshResponse(BaseModel):
+    article: BlogResponse
+    diffs: List[SectionDiff]
+    model: str
+    routing_reason: str
+
+
+BLOG_INCLUDE_OPTIONS = {"html", "toc", "seo"}
+
+
+def parse_blog_include(include: Optional[str]) -> set:
+    requested = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = requested - BLOG_INCLUDE_OPTIONS
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"include inconnu: {', '.join(sorted(unknown))} (valeurs possibles: html, toc, seo)",
+        )
+    return requested
+
+
+def build_blog_response(article: StoredArticle, include: set) -> BlogResponse:
+    scores = article.scores
+    artifacts = article.artifacts
+    return BlogResponse(
+        subject=article.subject,
+        markdown=article.markdown,
+        expertise_report=ExpertiseScores(
+            adn_cozetik=scores.get('coherence_adn', 0.0),
+            expertise_tech=scores.get('expert_tech', 0.0),
+            wording_humain=scores.get('wording_humain', 0.0),
+            structure_seo=scores.get('structure_seo', 0.0),
+            cta_impact=scores.get('cta_impact', 0.0)
+        ),
+        sources=article.sources,
+        article_id=article.article_id,
+        model=article.model or None,
+        routing_reason=article.routing_reason,
+        html=artifacts.html if "html" in include else None,
+        toc=artifacts.toc if "toc" in include else None,
+        seo=artifacts.seo if "seo" in include else None,
+    )
 
 
 app = FastAPI(title="Cozetik AI Services - Quiz & Blog")
@@ -38,62 +109,228 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profilage à la demande (no-op si PROFILING_ADMIN_TOKEN / PROFILING_SAMPLE_RATE absents)
+install_profiling(app)
 
-@app.post("/api/recommander", response_model=RecommendationOutput)
-async def generate_recommendation(data: QuizInput):
 
-    chain, context_path = get_quiz_chain()
+def set_model_headers(response: Response, decision) -> None:
+    """Expose le modèle choisi par le routeur et la raison du choix."""
+    if decision is None:
+        return
+    response.headers["X-Model"] = decision.model_id
+    # En-têtes HTTP en ASCII : accents retirés (clients qui décodent en UTF-8 ou latin-1)
+    reason = unicodedata.normalize("NFKD", decision.reason).encode("ascii", "ignore").decode("ascii")
+    response.headers["X-Model-Reason"] = reason
 
-    # Read context file content
+
+@app.post("/api/recommander", response_model=RecommendationOutput)
+async def generate_recommendation(data: QuizInput, response: Response):
+
+    # Journal des motifs de réponses (alimente le pré-chauffage hors-ligne)
     try:
-        with open(context_path, "r") as f:
-            system_prompt = f.read()
-    except FileNotFoundError:
-        system_prompt = ""
+        pattern_log.append(data.answers)
+    except OSError as e:
+        print(f"⚠️ Journal des motifs indisponible: {str(e)}")
 
-    answers_text = "\n".join([f"{key}:{value}" for key, value in data.answers.items()])
+    # Motif fréquent déjà pré-calculé pour la version courante de context.txt
+    cached = warm_cache.get(data.answers)
+    if cached is not None:
+        # La spéculation éventuelle ne servira pas : annulée ou comptée comme gaspillée
+        speculation_manager.discard(data.session_id)
+        response.headers["X-Cache"] = "hit"
+        return cached
 
-    final_prompt = f"{system_prompt}\n\nVoici Les Reponses du candidat:\n{answers_text}"
+    # Réutilise la recommandation spéculative si le profil dominant n'a pas changé
+    speculative = await speculation_manager.resolve(data.session_id, data.answers)
+    if speculative is not None:
+        res, _, decision = speculative
+        set_model_headers(response, decision)
+        return res
 
     try:
-        res = chain.invoke(final_prompt)
+        # Mode compact par défaut : identifiants du catalogue étendus côté serveur
+        res, _, decision = invoke_recommendation(data.answers)
+        set_model_headers(response, decision)
 
         return res 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/v1/generate", response_model=BlogResponse)
-async def generate_blog_post(request: BlogRequest):
+@app.post("/api/recommander/batch")
+async def generate_batch_recommendations(request: Request, x_batch_token: Optional[str] = Header(default=None)):
+    """
+    Scoring d'une cohorte (tableau JSON ou CSV). Réponse en NDJSON : une ligne
+    par collaborateur dans l'ordre d'entrée, puis une ligne de résumé.
+    Réservé aux clients B2B : en-tête X-Batch-Token requis.
+    """
+    if not check_batch_token(x_batch_token):
+        raise HTTPException(status_code=403, detail="Jeton batch invalide")
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "csv" in content_type:
+            items = parse_batch_csv(body.decode("utf-8"))
+        else:
+            items = parse_batch_json(body)
+    except (BatchInputError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def ndjson():
+        async for line in stream_batch(items):
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/api/recommander/partial", response_model=SpeculationStatus)
+async def submit_partial_answers(data: PartialQuizInput):
+    """
+    Reçoit les réponses au fil du quiz et lance une recommandation spéculative
+    dès que le profil dominant estimé est stable.
+    """
+    return speculation_manager.submit_partial(data.session_id, data.answers)
+
+
+@app.get("/api/recommander/speculation/metrics")
+async def get_speculation_metrics():
+    """
+    Taux de réutilisation des spéculations et tokens gaspillés.
+    """
+    return speculation_manager.metrics()
+
+
+@app.get("/api/recommander/cache/stats")
+async def get_warm_cache_stats():
+    """
+    État du cache pré-chauffé (nombre de motifs, à jour de context.txt ou non).
+    """
+    return warm_cache.stats()
+
+
+@app.post("/api/v1/generate", response_model=BlogResponse, response_model_exclude_none=True)
+async def generate_blog_post(request: BlogRequest, include: Optional[str] = Query(default=None)):
     """
     Génère un article de blog complet avec rapport d'expertise.
+    Les artefacts (HTML, sommaire, SEO) sont calculés une fois et stockés avec
+    l'article ; `include=html,toc,seo` les ajoute à la réponse.
     """
+    include_set = parse_blog_include(include)
     try:
         print(f"📝 Génération demandée pour: {request.subject}")
         
         # Import du module blogBot
-        from app.agents.blogBot.main import generate_blog
-        
-        # Génération de l'article
-        article_markdown, metadata = generate_blog(request.subject, with_metadata=True)
+        from app.agents.blogBot.main import format_context, generate_blog
+        from app.agents.blogBot.refresh import load_corpus, snapshot_corpus
         
-        scores = metadata.get('scores', {})
+        # Corpus lu une fois : le texte envoyé au modèle est celui qu'on enregistre
+        corpus = load_corpus()
+        article_markdown, metadata = generate_blog(
+            request.subject, with_metadata=True, context=format_context(corpus)
+        )
         
-        return BlogResponse(
+        created_at = now_iso()
+        article = article_store.save(
             subject=request.subject,
             markdown=article_markdown,
-            expertise_report=ExpertiseScores(
-                adn_cozetik=scores.get('coherence_adn', 0.0),
-                expertise_tech=scores.get('expert_tech', 0.0),
-                wording_humain=scores.get('wording_humain', 0.0),
-                structure_seo=scores.get('structure_seo', 0.0),
-                cta_impact=scores.get('cta_impact', 0.0)
-            ),
-            sources=metadata.get('sources', [])
+            artifacts=build_artifacts(article_markdown, subject=request.subject, published_at=created_at),
+            model=metadata.get('model', ''),
+            scores=metadata.get('scores', {}),
+            sources=metadata.get('sources', []),
+            corpus_versions=snapshot_corpus(article_store, corpus),
+            routing_reason=metadata.get('routing_reason'),
+            created_at=created_at,
         )
         
+        return build_blog_response(article, include_set)
+        
     except Exception as e:
         print(f"❌ Erreur lors de la génération du blog: {str(e)}")
         import traceback
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Erreur de génération: {str(e)}")
+
+
+@app.get("/api/v1/articles/{article_id}", response_model=BlogResponse, response_model_exclude_none=True)
+async def get_blog_article(article_id: str, include: Optional[str] = Query(default=None)):
+    """
+    Relit un article généré et ses artefacts pré-calculés depuis le stockage.
+    """
+    include_set = parse_blog_include(include)
+    article = article_store.get(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article introuvable")
+    return build_blog_response(article, include_set)
+
+
+@app.post("/api/v1/articles/stale", response_model=List[StaleArticle])
+async def list_stale_articles(request: StaleArticlesRequest):
+    """
+    Articles stockés à rafraîchir après une modification du corpus
+    (ex: `{"changed_files": ["tech_com_offres.txt"]}`), avec les sections concernées.
+    """
+    from app.agents.blogBot.refresh import find_stale_articles
+
+    return find_stale_articles(article_store, request.changed_files)
+
+
+@app.post("/api/v1/articles/{article_id}/refresh", response_model=SectionRefreshResponse, response_model_exclude_none=True)
+async def refresh_article_sections(article_id: str, request: SectionRefreshRequest):
+    """
+    Régénère uniquement les sections demandées (ex: CTA, LA MÉTHODE), le reste
+    de l'article servant de contexte figé. Renvoie l'article mis à jour et un
+    diff par section.
+    """
+    from app.agents.blogBot.refresh import SectionNotFound, regenerate_sections
+
+    article = article_store.get(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article introuvable")
+    if not request.sections:
+        raise HTTPException(status_code=422, detail="Aucune section à régénérer")
+
+    try:
+        updated, diffs, decision = regenerate_sections(article, request.sections, article_store)
+    except SectionNotFound as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        print(f"❌ Erreur lors du rafraîchissement de l'article: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erreur de régénération: {str(e)}")
+
+    return SectionRefreshResponse(
+        article=build_blog_response(updated, set()),
+        diffs=diffs,
+        model=decision.model_id,
+        routing_reason=decision.reason,
+    )
+
+
+@app.get("/api/models/stats")
+async def get_model_stats():
+    """
+    Statistiques glissantes du routeur par endpoint et modèle (latence p50, taux d'erreur).
+    """
+    return model_router.snapshot()
+
+
+@app.get("/api/admin/profiles")
+async def get_profiles(x_profile_token: Optional[str] = Header(default=None)):
+    """
+    Liste les profils de requêtes enregistrés (HTML flamegraph + speedscope).
+    """
+    if not check_admin_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Jeton admin invalide")
+    return {"profiles": list_profiles()}
+
+
+@app.get("/api/admin/profiles/{name}")
+async def download_profile(name: str, x_profile_token: Optional[str] = Header(default=None)):
+    """
+    Télécharge un profil (ouvrir le .speedscope.json sur speedscope.app).
+    """
+    if not check_admin_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Jeton admin invalide")
+    path = resolve_profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil introuvable")
+    return FileResponse(path, filename=name)
@@ -0,0 +1,187 @@
+"""
+Registre des modèles et routage par requête.
+
+Les modèles et les profils par endpoint (température, max_tokens, modèles
+candidats par niveau de complexité) sont lus depuis `model_registry.json`
+(ou `MODEL_REGISTRY_PATH`). Pour chaque requête, le routeur choisit un modèle
+parmi les candidats du niveau demandé en écartant ceux dont le taux d'erreur
+récent est trop élevé et en basculant vers plus rapide quand la latence
+médiane dépasse le budget de l'endpoint. Les mesures expirent après
+`max_sample_age_seconds` : un modèle écarté redevient candidat une fois ses
+erreurs oubliées. Le modèle retenu et la raison du choix sont renvoyés aux
+endpoints pour être exposés dans la réponse.
+"""
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, model_validator
+
+
+MODEL_REGISTRY_PATH = Path(os.getenv("MODEL_REGISTRY_PATH", Path(__file__).parent / "model_registry.json"))
+
+
+class ModelConfig(BaseModel):
+    id: str = Field(description="Identifiant du modèle côté API Anthropic")
+
+class EndpointProfile(BaseModel):
+    temperature: float
+    max_tokens: int
+    compact_max_tokens: Optional[int] = None
+    tiers: Dict[str, List[str]] = Field(description="Modèles candidats par niveau de complexité, par ordre de préférence")
+
+class RoutingConfig(BaseModel):
+    window: int = 50
+    min_samples: int = 5
+    max_error_rate: float = 0.25
+    # Au-delà, une mesure est oubliée (un modèle écarté est alors retenté)
+    max_sample_age_seconds: float = 300
+    latency_budget_seconds: Dict[str, float] = Field(default_factory=dict)
+
+class RegistryConfig(BaseModel):
+    models: Dict[str, ModelConfig]
+    endpoints: Dict[str, EndpointProfile]
+    routing: RoutingConfig = Field(default_factory=RoutingConfig)
+
+    @model_validator(mode="after")
+    def check_tiers(self):
+        for name, profile in self.endpoints.items():
+            if not profile.tiers or not all(profile.tiers.values()):
+                raise ValueError(f"Endpoint {name} sans modèle candidat")
+            for models in profile.tiers.values():
+                unknown = [m for m in models if m not in self.models]
+                if unknown:
+                    raise ValueError(f"Endpoint {name}: modèles inconnus {unknown}")
+        return self
+
+
+def load_registry(path: Path = MODEL_REGISTRY_PATH) -> RegistryConfig:
+    return RegistryConfig.model_validate_json(Path(path).read_text(encoding="utf-8"))
+
+
+class RoutingDecision:
+    def __init__(self, endpoint: str, model_key: str, model_id: str, profile: EndpointProfile, reason: str):
+        self.endpoint = endpoint
+        self.model_key = model_key
+        self.model_id = model_id
+        self.temperature = profile.temperature
+        self.max_tokens = profile.max_tokens
+        self.compact_max_tokens = profile.compact_max_tokens or profile.max_tokens
+        self.reason = reason
+
+
+class _ModelStats:
+    def __init__(self, window: int):
+        # (horodatage, latence, succès)
+        self.calls: Deque[Tuple[float, float, bool]] = deque(maxlen=window)
+
+    def expire(self, before: float) -> None:
+        while self.calls and self.calls[0][0] < before:
+            self.calls.popleft()
+
+    @property
+    def samples(self) -> int:
+        return len(self.calls)
+
+    @property
+    def error_rate(self) -> float:
+        return sum(1 for _, _, ok in self.calls if not ok) / len(self.calls) if self.calls else 0.0
+
+    @property
+    def p50(self) -> Optional[float]:
+        latencies = [latency for _, latency, ok in self.calls if ok]
+        return statistics.median(latencies) if latencies else None
+
+    def describe(self) -> str:
+        if not self.calls:
+            return "pas encore de mesure"
+        p50 = f"{self.p50:.1f}s" if self.p50 is not None else "n/a"
+        return f"p50 {p50}, erreurs {self.error_rate:.0%} sur {self.samples}"
+
+
+class ModelRouter:
+    def __init__(self, config: RegistryConfig, clock=time.monotonic):
+        self.config = config
+        self._clock = clock
+        self._stats: Dict[Tuple[str, str], _ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, endpoint: str, model_key: str) -> _ModelStats:
+        key = (endpoint, model_key)
+        if key not in self._stats:
+            self._stats[key] = _ModelStats(self.config.routing.window)
+        stats = self._stats[key]
+        stats.expire(self._clock() - self.config.routing.max_sample_age_seconds)
+        return stats
+
+    def route(self, endpoint: str, complexity: str = "default", signal: str = "") -> RoutingDecision:
+        """Choisit un modèle pour l'endpoint ; `signal` décrit la complexité détectée (pour la raison)."""
+        profile = self.config.endpoints[endpoint]
+        tier = complexity if complexity in profile.tiers else next(iter(profile.tiers))
+        candidates = profile.tiers[tier]
+        routing = self.config.routing
+        reasons = [f"{signal}, niveau {tier}" if signal else f"niveau {tier}"]
+
+        with self._lock:
+            stats = {m: self._get_stats(endpoint, m) for m in candidates}
+
+            healthy = []
+            for m in candidates:
+                s = stats[m]
+                if s.samples >= routing.min_samples and s.error_rate > routing.max_error_rate:
+                    reasons.append(f"{m} écarté ({s.describe()})")
+                else:
+                    healthy.append(m)
+
+            if not healthy:
+                chosen = min(candidates, key=lambda m: stats[m].error_rate)
+                reasons.append(f"tous dégradés, {chosen} a le moins d'erreurs")
+            else:
+                chosen = healthy[0]
+                budget = routing.latency_budget_seconds.get(endpoint)
+                p50 = stats[chosen].p50
+                if budget is not None and p50 is not None and p50 > budget and stats[chosen].samples >= routing.min_samples:
+                    faster = [m for m in healthy[1:] if stats[m].p50 is not None and stats[m].p50 < p50]
+                    # Sans alternative mesurée plus rapide, on essaie un candidat jamais mesuré
+                    untried = [m for m in healthy[1:] if stats[m].p50 is None]
+                    if faster or untried:
+                        reasons.append(f"{chosen} hors budget ({p50:.1f}s > {budget:.0f}s)")
+                        chosen = min(faster, key=lambda m: stats[m].p50) if faster else untried[0]
+                reasons.append(f"{chosen} ({stats[chosen].describe()})")
+
+        return RoutingDecision(endpoint, chosen, self.config.models[chosen].id, profile, " ; ".join(reasons))
+
+    def record(self, decision: RoutingDecision, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._get_stats(decision.endpoint, decision.model_key).calls.append((self._clock(), latency, ok))
+
+    @contextmanager
+    def track(self, decision: RoutingDecision):
+        """Mesure l'appel modèle englobé et l'ajoute aux statistiques glissantes."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(decision, time.perf_counter() - start, ok=False)
+            raise
+        self.record(decision, time.perf_counter() - start, ok=True)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snapshot = {}
+            for endpoint, model in list(self._stats):
+                s = self._get_stats(endpoint, model)
+                snapshot[f"{endpoint}/{model}"] = {
+                    "samples": s.samples,
+                    "error_rate": s.error_rate,
+                    "p50_seconds": s.p50,
+                }
+            return snapshot
+
+
+model_router = ModelRouter(load_registry())
@@ -0,0 +1,153 @@
+"""
+Profilage à la demande des requêtes lentes (pyinstrument).
+
+Activé soit par l'en-tête `X-Profile-Token` portant le jeton admin, soit par
+échantillonnage d'un pourcentage des requêtes. Le middleware englobe toute la
+requête (validation pydantic, langchain, construction du prompt, appel amont)
+et écrit un rendu HTML (flamegraph) et un fichier speedscope par requête. Le
+rendu et l'écriture se font hors de la boucle d'événements, et seuls les
+`PROFILING_MAX_FILES` fichiers les plus récents sont gardés.
+
+Sans jeton ni taux d'échantillonnage configurés, le middleware n'est pas
+installé du tout : coût nul quand le profilage est désactivé.
+"""
+import asyncio
+import hmac
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILED_PATHS = ("/api/recommander", "/api/v1/generate")
+
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # en %
+PROFILING_DIR = Path(os.getenv("PROFILING_DIR", "profiles"))
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.001"))  # en secondes
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "200"))  # 2 fichiers par profil
+
+PROFILE_SUFFIXES = (".html", ".speedscope.json")
+
+
+def is_profiling_enabled(admin_token: str = PROFILING_ADMIN_TOKEN, sample_rate: float = PROFILING_SAMPLE_RATE) -> bool:
+    return bool(admin_token) or sample_rate > 0
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI qui profile les routes ciblées quand l'en-tête ou le tirage le demande."""
+
+    def __init__(
+        self,
+        app,
+        paths: Iterable[str] = PROFILED_PATHS,
+        output_dir: Path = PROFILING_DIR,
+        admin_token: str = PROFILING_ADMIN_TOKEN,
+        sample_rate: float = PROFILING_SAMPLE_RATE,
+        interval: float = PROFILING_INTERVAL,
+        max_files: int = PROFILING_MAX_FILES,
+    ):
+        self.app = app
+        self.paths = set(paths)
+        self.output_dir = Path(output_dir)
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_files = max_files
+
+    def _should_profile(self, scope) -> bool:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return False
+        if self.admin_token:
+            header = PROFILE_HEADER.lower().encode()
+            for key, value in scope.get("headers", []):
+                if key == header and hmac.compare_digest(value, self.admin_token.encode()):
+                    return True
+        return self.sample_rate > 0 and random.random() * 100 < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Import paresseux : pyinstrument n'est chargé que si on profile vraiment
+        from pyinstrument import Profiler
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}_{scope['path'].strip('/').replace('/', '-')}_{uuid.uuid4().hex[:8]}"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            # Rendus HTML / speedscope coûteux : hors de la boucle d'événements
+            await asyncio.to_thread(self._write, profiler, profile_id)
+
+    def _write(self, profiler, profile_id: str) -> None:
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            (self.output_dir / f"{profile_id}.html").write_text(profiler.output_html(), encoding="utf-8")
+            (self.output_dir / f"{profile_id}.speedscope.json").write_text(
+                profiler.output(renderer=SpeedscopeRenderer()), encoding="utf-8"
+            )
+            print(f"🔬 Profil écrit: {profile_id}")
+            prune_profiles(self.max_files, self.output_dir)
+        except Exception as e:
+            print(f"⚠️ Écriture du profil impossible: {str(e)}")
+
+
+def install_profiling(app) -> None:
+    """Ajoute le middleware uniquement si le profilage est configuré."""
+    if is_profiling_enabled():
+        app.add_middleware(ProfilingMiddleware)
+
+
+def list_profiles(output_dir: Path = PROFILING_DIR) -> List[dict]:
+    """Liste les profils disponibles, du plus récent au plus ancien."""
+    output_dir = Path(output_dir)
+    if not output_dir.is_dir():
+        return []
+
+    profiles = []
+    for f in output_dir.iterdir():
+        if f.is_file() and f.name.endswith(PROFILE_SUFFIXES):
+            stat = f.stat()
+            profiles.append({"name": f.name, "size": stat.st_size, "created_at": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def prune_profiles(max_files: int = PROFILING_MAX_FILES, output_dir: Path = PROFILING_DIR) -> int:
+    """Supprime les profils les plus anciens au-delà de `max_files` fichiers ; renvoie le nombre supprimé."""
+    removed = 0
+    for profile in list_profiles(output_dir)[max_files:]:
+        try:
+            (Path(output_dir) / profile["name"]).unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def resolve_profile_path(name: str, output_dir: Path = PROFILING_DIR) -> Optional[Path]:
+    """Chemin d'un profil existant, ou None (refuse tout nom hors du dossier)."""
+    if os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIXES):
+        return None
+    path = Path(output_dir) / name
+    return path if path.is_file() else None
+
+
+def check_admin_token(token: Optional[str], admin_token: str = PROFILING_ADMIN_TOKEN) -> bool:
+    return bool(admin_token) and token is not None and hmac.compare_digest(token.encode(), admin_token.encode())
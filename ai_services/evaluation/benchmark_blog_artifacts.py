@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+evaluation/benchmark_blog_artifacts.py
+
+Benchmark du calcul des artefacts de blog (HTML, sommaire, SEO, JSON-LD)
+sur des articles de grande taille, en une passe sur le markdown.
+
+Usage: python evaluation/benchmark_blog_artifacts.py [nb_sections] [repetitions]
+"""
+
+import os
+import sys
+import time
+
+# Ajouter le path parent pour les imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.blogBot.artifacts import ArtifactBuilder, build_artifacts
+
+
+SECTION = """## Étape {i} : reprendre le **contrôle** de sa journée
+
+Tu cours toute la journée et pourtant rien n'avance vraiment. Le problème n'est pas
+ton organisation : c'est la *charge mentale* qui s'accumule. Voir [le quiz](https://cozetik.fr/quiz).
+
+### Ce qu'il faut retenir
+
+1. Note tout ce qui traîne dans ta tête (5 minutes).
+2. Garde **trois** priorités, pas une de plus.
+3. Bloque un créneau `sans notifications` chaque matin.
+
+- Astuce : commence petit.
+- Astuce : célèbre chaque pas.
+
+> On ne se forme pas pour ajouter une couche. On se forme pour enlever ce qui bloque.
+
+"""
+
+
+def make_article(sections: int) -> str:
+    head = "# Tu n'as pas un problème de temps, tu as un problème de clarté\n\n"
+    return head + "".join(SECTION.format(i=i) for i in range(1, sections + 1))
+
+
+def bench(label: str, fn, repetitions: int) -> float:
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"   {label:<28} meilleur: {best * 1000:8.2f} ms   moyen: {sum(timings) / len(timings) * 1000:8.2f} ms")
+    return best
+
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    markdown = make_article(sections)
+    size_kb = len(markdown.encode("utf-8")) / 1024
+
+    print("=" * 60)
+    print("⏱️  BENCHMARK ARTEFACTS BLOG")
+    print("=" * 60)
+    print(f"   Article: {sections} sections, {size_kb:.0f} Ko, {markdown.count(chr(10))} lignes")
+
+    best = bench("build_artifacts (1 bloc)", lambda: build_artifacts(markdown, subject="Benchmark"), repetitions)
+
+    def streamed():
+        # Simule un flux du modèle : morceaux de 64 caractères
+        builder = ArtifactBuilder(subject="Benchmark")
+        for i in range(0, len(markdown), 64):
+            builder.feed(markdown[i:i + 64])
+        builder.finish()
+
+    bench("ArtifactBuilder (flux 64 c)", streamed, repetitions)
+
+    artifacts = build_artifacts(markdown, subject="Benchmark")
+    print(f"   Débit: {size_kb / 1024 / best:.1f} Mo/s")
+    print(f"   Sommaire: {len(artifacts.toc)} entrées, {artifacts.seo.word_count} mots, "
+          f"{artifacts.seo.reading_time_minutes} min de lecture")
+
+
+if __name__ == "__main__":
+    main()
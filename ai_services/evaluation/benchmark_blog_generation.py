@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+evaluation/benchmark_blog_generation.py
+
+Benchmark de generate_blog sur un jeu fixe de sujets (evaluation/blog_subjects.py),
+pour chaque combinaison de modes :
+- contexte complet vs réduit (sans le guide éditorial com_blog_cozetik.txt)
+- préfixe système mis en cache (cache_control) vs non caché
+- réponse en flux vs réponse en un bloc
+
+Mesures par article : temps jusqu'au premier token, latence totale, tokens
+d'entrée / sortie / cache, longueur, contrôles de conformité au prompt
+blog_system_prompt.txt. Les résultats sont écrits dans
+evaluation/results/blog_generation/<run_id>.json (schéma versionné) et
+comparés automatiquement au run précédent.
+
+Amonts :
+- simulated (défaut) : modèle de latence déterministe, hors-ligne
+- replay : rejoue evaluation/cassettes/blog_generation.json
+- record : appelle l'API réelle et enregistre la cassette
+- live : appelle l'API réelle sans enregistrer
+
+Usage:
+    python evaluation/benchmark_blog_generation.py [--upstream simulated|replay|record|live]
+        [--subjects N] [--modes full-cached-stream,...] [--repeat N]
+    python evaluation/benchmark_blog_generation.py --compare BASE.json [CANDIDAT.json]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Ajouter le path parent pour les imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+# Chargé avant les modules applicatifs, qui lisent leur configuration à l'import
+load_dotenv()
+
+from app.agents.blogBot.artifacts import build_artifacts
+from app.agents.blogBot.main import build_system_prompt, generate_blog, load_cozetik_context, load_prompt
+from app.model_registry import model_router
+from evaluation.blog_compliance import check_article, compliance_score, load_rules
+from evaluation.blog_subjects import BLOG_SUBJECTS
+from evaluation.blog_upstreams import (
+    CassetteMiss,
+    RecordingUpstream,
+    ReplayUpstream,
+    SimulatedUpstream,
+    VirtualClock,
+    WallClock,
+)
+
+
+SCHEMA_VERSION = 1
+EVAL_DIR = Path(__file__).parent
+RESULTS_DIR = EVAL_DIR / "results" / "blog_generation"
+CASSETTE_PATH = EVAL_DIR / "cassettes" / "blog_generation.json"
+
+# Contexte réduit : le guide éditorial (exemples, tonalité détaillée) est
+# retiré, la grille tarifaire et le catalogue restent
+REDUCED_CONTEXT_EXCLUDE = ("com_blog_cozetik.txt",)
+
+CONTEXTS = ("full", "reduced")
+PREFIXES = ("cached", "uncached")
+TRANSPORTS = ("stream", "sync")
+# Comportement actuel de /api/v1/generate : référence des comparaisons entre modes
+BASELINE_MODE = "full-uncached-sync"
+
+# Métriques résumées : (clé, libellé, affichée en pourcentage)
+METRICS = [
+    ("ttft_s", "TTFT (s)", False),
+    ("total_s", "Latence (s)", False),
+    ("input_tokens", "Tokens entrée", False),
+    ("cache_read_input_tokens", "Tokens cache lus", False),
+    ("cache_creation_input_tokens", "Tokens cache écrits", False),
+    ("output_tokens", "Tokens sortie", False),
+    ("words", "Mots", False),
+    ("compliance", "Conformité", True),
+]
+
+
+def all_modes() -> List[str]:
+    return ["-".join(combo) for combo in itertools.product(CONTEXTS, PREFIXES, TRANSPORTS)]
+
+
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=EVAL_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- Exécution ------------------------------------------------------------------
+
+def run_one(subject: Dict, mode: str, contexts: Dict[str, str], client, clock, rules) -> Dict:
+    context, prefix, transport = mode.split("-")
+    first_token: List[float] = []
+
+    def on_text(text: str):
+        if text and not first_token:
+            first_token.append(clock())
+
+    start = clock()
+    try:
+        article, metadata = generate_blog(
+            subject["subject"],
+            with_metadata=True,
+            context=contexts[context],
+            cache_prefix=(prefix == "cached"),
+            stream=(transport == "stream"),
+            on_text=on_text,
+            client=client,
+        )
+    except CassetteMiss:
+        raise
+    except Exception as e:
+        print(f"   ❌ {subject['name']}: {str(e)}")
+        return {"subject": subject["name"], "error": str(e)}
+    total = clock() - start
+
+    checks = check_article(article, rules, subject.get("expected_program"))
+    artifacts = build_artifacts(article, subject=subject["subject"])
+    row = {
+        "subject": subject["name"],
+        "ttft_s": round((first_token[0] if first_token else clock()) - start, 3),
+        "total_s": round(total, 3),
+        **metadata["usage"],
+        "chars": len(article),
+        "words": artifacts.seo.word_count,
+        "compliance": round(compliance_score(checks), 3),
+        "checks": checks,
+    }
+    print(f"   {subject['name']:<20} TTFT {row['ttft_s']:6.2f} s  total {row['total_s']:6.2f} s  "
+          f"{row['output_tokens']:5d} tok  conformité {row['compliance']:.0%}")
+    return row
+
+
+def summarize(rows: List[Dict]) -> Dict:
+    ok = [r for r in rows if "error" not in r]
+    summary = {"runs": len(rows), "errors": len(rows) - len(ok)}
+    if not ok:
+        return summary
+    for key, _, _ in METRICS:
+        values = [r[key] for r in ok]
+        summary[key] = {"mean": round(statistics.mean(values), 3), "p50": round(statistics.median(values), 3)}
+    prefix_tokens = sum(r["cache_read_input_tokens"] for r in ok)
+    all_input = sum(r["input_tokens"] + r["cache_read_input_tokens"] + r["cache_creation_input_tokens"] for r in ok)
+    summary["cache_hit_ratio"] = round(prefix_tokens / all_input, 3) if all_input else 0.0
+    summary["checks"] = {
+        name: round(sum(r["checks"].get(name, False) for r in ok) / len(ok), 3)
+        for name in sorted({name for r in ok for name in r["checks"]})
+    }
+    return summary
+
+
+def make_upstream(kind: str, cassette: Path):
+    if kind == "simulated":
+        clock = VirtualClock()
+        return SimulatedUpstream(clock), clock
+    if kind == "replay":
+        clock = VirtualClock()
+        return ReplayUpstream(clock, cassette), clock
+    from anthropic import Anthropic
+
+    client = Anthropic()  # lit ANTHROPIC_API_KEY dans l'environnement
+    if kind == "record":
+        return RecordingUpstream(client, cassette), WallClock()
+    return client, WallClock()
+
+
+def run_benchmark(upstream: str, subjects: List[Dict], modes: List[str], repeat: int, cassette: Path) -> Dict:
+    client, clock = make_upstream(upstream, cassette)
+    rules = load_rules()
+    contexts = {
+        "full": load_cozetik_context(),
+        "reduced": load_cozetik_context(exclude=REDUCED_CONTEXT_EXCLUDE),
+    }
+
+    results = {}
+    try:
+        for mode in modes:
+            print(f"\n📝 {mode}")
+            rows = [
+                run_one(subject, mode, contexts, client, clock, rules)
+                for _ in range(repeat)
+                for subject in subjects
+            ]
+            results[mode] = {"summary": summarize(rows), "runs": rows}
+    finally:
+        if isinstance(client, RecordingUpstream):
+            client.save()
+            print(f"\n💾 Cassette: {cassette}")
+
+    created_at = datetime.now(timezone.utc)
+    commit = git_commit()
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "run_id": f"{created_at:%Y%m%d-%H%M%S}-{upstream}-{commit}",
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "upstream": upstream,
+        "model": model_router.route("blog").model_id,
+        "prompt_sha256": sha256(load_prompt("blog_system_prompt.txt")),
+        "system_sha256": {name: sha256(build_system_prompt(text)) for name, text in contexts.items()},
+        "subjects": [s["name"] for s in subjects],
+        "repeat": repeat,
+        "modes": results,
+    }
+
+
+# --- Rapports -------------------------------------------------------------------
+
+def _value(summary: Dict, key: str) -> Optional[float]:
+    metric = summary.get(key)
+    return metric["mean"] if isinstance(metric, dict) else None
+
+
+def _delta(base: Optional[float], new: Optional[float], percent: bool = False) -> str:
+    if base is None or new is None:
+        return "n/a"
+    if percent:
+        return f"{(new - base) * 100:+.0f} pts"
+    if base == 0:
+        return "=" if new == 0 else f"{new:+.4g}"
+    return f"{(new - base) / base:+.0%}"
+
+
+def _fmt(value: Optional[float], percent: bool = False) -> str:
+    if value is None:
+        return "n/a"
+    return f"{value:.0%}" if percent else f"{value:.4g}"
+
+
+def mode_report(run: Dict) -> str:
+    """Comparaison des modes d'un même run, par rapport à BASELINE_MODE."""
+    modes = run["modes"]
+    base = modes.get(BASELINE_MODE, {}).get("summary", {})
+    lines = [
+        f"## Modes — {run['run_id']} ({run['upstream']}, {run['model']})",
+        "",
+        "| Mode | " + " | ".join(label for _, label, _ in METRICS) + " | Cache |",
+        "|---" * (len(METRICS) + 2) + "|",
+    ]
+    for mode, data in modes.items():
+        summary = data["summary"]
+        cells = []
+        for key, _, percent in METRICS:
+            value = _value(summary, key)
+            cell = _fmt(value, percent)
+            if base and mode != BASELINE_MODE:
+                cell += f" ({_delta(_value(base, key), value, percent)})"
+            cells.append(cell)
+        errors = f" ⚠️ {summary['errors']} erreur(s)" if summary.get("errors") else ""
+        lines.append(f"| {mode}{errors} | " + " | ".join(cells) + f" | {summary.get('cache_hit_ratio', 0):.0%} |")
+    if base:
+        lines += ["", f"Entre parenthèses : écart relatif à `{BASELINE_MODE}`."]
+    return "\n".join(lines)
+
+
+def compare_runs(base: Dict, candidate: Dict) -> str:
+    """Rapport d'écarts entre deux runs, mode par mode, avec les contrôles de conformité dégradés."""
+    lines = [f"## Comparaison {base['run_id']} → {candidate['run_id']}", ""]
+    for label, key in (("Commit", "git_commit"), ("Modèle", "model"), ("Amont", "upstream"), ("Prompt", "prompt_sha256")):
+        if base.get(key) != candidate.get(key):
+            lines.append(f"- {label} : {base.get(key)} → {candidate.get(key)}")
+    if base.get("subjects") != candidate.get("subjects"):
+        lines.append("- ⚠️ Jeux de sujets différents : écarts à interpréter avec prudence")
+
+    common = [mode for mode in candidate["modes"] if mode in base["modes"]]
+    if not common:
+        lines.append("\nAucun mode commun.")
+        return "\n".join(lines)
+
+    lines += [
+        "",
+        "| Mode | Métrique | Avant | Après | Écart |",
+        "|---|---|---|---|---|",
+    ]
+    regressions = []
+    for mode in common:
+        old, new = base["modes"][mode]["summary"], candidate["modes"][mode]["summary"]
+        for key, label, percent in METRICS:
+            before, after = _value(old, key), _value(new, key)
+            lines.append(f"| {mode} | {label} | {_fmt(before, percent)} | {_fmt(after, percent)} | {_delta(before, after, percent)} |")
+        for name, rate in new.get("checks", {}).items():
+            previous = old.get("checks", {}).get(name)
+            if previous is not None and rate < previous:
+                regressions.append(f"- {mode} : {name} {previous:.0%} → {rate:.0%}")
+
+    lines += ["", "### Contrôles de conformité en baisse", ""] + (regressions or ["Aucun."])
+    return "\n".join(lines)
+
+
+def load_run(path: Path) -> Dict:
+    run = json.loads(Path(path).read_text(encoding="utf-8"))
+    if run.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: schéma {run.get('schema_version')} non supporté (attendu {SCHEMA_VERSION})")
+    return run
+
+
+def previous_run(results_dir: Path, exclude: Path) -> Optional[Path]:
+    runs = sorted(p for p in results_dir.glob("*.json") if p != exclude)
+    return runs[-1] if runs else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de génération d'articles de blog")
+    parser.add_argument("--upstream", choices=("simulated", "replay", "record", "live"), default="simulated")
+    parser.add_argument("--cassette", type=Path, default=CASSETTE_PATH)
+    parser.add_argument("--subjects", type=int, default=len(BLOG_SUBJECTS), help="nombre de sujets")
+    parser.add_argument("--modes", default=",".join(all_modes()), help="modes séparés par des virgules")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--no-save", action="store_true", help="ne pas écrire le fichier de résultats")
+    parser.add_argument("--compare", nargs="+", type=Path, metavar="RUN", help="comparer BASE [CANDIDAT] sans lancer de run")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        base = load_run(args.compare[0])
+        candidate_path = args.compare[1] if len(args.compare) > 1 else previous_run(args.results_dir, args.compare[0])
+        if candidate_path is None:
+            parser.error("aucun run candidat à comparer")
+        print(compare_runs(base, load_run(candidate_path)))
+        return
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(all_modes())
+    if unknown:
+        parser.error(f"modes inconnus: {', '.join(sorted(unknown))} (possibles: {', '.join(all_modes())})")
+
+    print("=" * 60)
+    print("📰 BENCHMARK GÉNÉRATION BLOG")
+    print("=" * 60)
+    run = run_benchmark(args.upstream, BLOG_SUBJECTS[:args.subjects], modes, args.repeat, args.cassette)
+
+    report = [mode_report(run)]
+    if not args.no_save:
+        args.results_dir.mkdir(parents=True, exist_ok=True)
+        path = args.results_dir / f"{run['run_id']}.json"
+        path.write_text(json.dumps(run, ensure_ascii=False, indent=2), encoding="utf-8")
+        previous = previous_run(args.results_dir, path)
+        if previous is not None:
+            report.append(compare_runs(load_run(previous), run))
+        path.with_suffix(".md").write_text("\n\n".join(report) + "\n", encoding="utf-8")
+        print(f"\n💾 Résultats: {path}")
+
+    print("\n" + "\n\n".join(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# evaluation/blog_compliance.py
+"""
+Contrôles de conformité structurelle d'un article par rapport à
+blog_system_prompt.txt.
+
+Les règles sont lues dans le prompt lui-même (sections de la STRUCTURE
+STRICTE, phrases imposées entre guillemets, nombre d'étapes de la méthode,
+programmes cités en exemple) : modifier le prompt met les contrôles à jour.
+"""
+
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Ajouter le path parent pour les imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.blogBot.artifacts import plain_text, slugify
+from app.agents.blogBot.main import load_prompt
+from app.agents.blogBot.refresh import Section, split_sections
+
+
+_STRUCTURE_ITEM = re.compile(r"^\s*\d+\.\s+([^:(]+?)\s*(?:\([^)]*\))?\s*:")
+_QUOTED = re.compile(r"\"([^\"\n]{15,})\"")
+_STEP_RANGE = re.compile(r"(\d+)\s*à\s*(\d+)\s*étapes", re.IGNORECASE)
+_EXAMPLES = re.compile(r"\(ex\s*:\s*([^)]+)\)")
+_PRICE = re.compile(r"\d[\d\s]*\s*€")
+_LIST_ITEM = re.compile(r"^(?:\d+[.)]|[-*+])\s+")
+_ARTICLE = re.compile(r"^(?:le|la|les|l)-")
+
+# Sections de la structure qui ne sont pas des titres H2 attendus
+_NOT_HEADINGS = {"titre", "accroche", "cta"}
+
+
+class PromptRules:
+    def __init__(self, sections: List[str], signature: str, cta: str, step_range: Tuple[int, int], programmes: List[str]):
+        self.sections = sections
+        self.signature = signature
+        self.cta = cta
+        self.step_range = step_range
+        self.programmes = programmes
+
+
+def load_rules(template: Optional[str] = None) -> PromptRules:
+    """Extrait les règles vérifiables du prompt de rédaction."""
+    template = template if template is not None else load_prompt("blog_system_prompt.txt")
+    structure = template.split("STRUCTURE DE L'ARTICLE", 1)[-1]
+
+    sections: List[str] = []
+    texts: Dict[str, str] = {}
+    current = None
+    for line in structure.split("\n"):
+        item = _STRUCTURE_ITEM.match(line)
+        if item and item.group(1).isupper():
+            current = item.group(1)
+            sections.append(current)
+            texts[current] = line.strip()
+        elif current and line.strip():
+            texts[current] += " " + line.strip()
+
+    def quoted(name: str) -> str:
+        found = _QUOTED.findall(texts.get(name, ""))
+        return found[0] if found else ""
+
+    steps = _STEP_RANGE.search(texts.get("LA MÉTHODE", ""))
+    examples = _EXAMPLES.search(texts.get("CTA", ""))
+    return PromptRules(
+        sections=sections,
+        signature=quoted("CONCLUSION"),
+        cta=quoted("CTA"),
+        step_range=(int(steps.group(1)), int(steps.group(2))) if steps else (1, 99),
+        programmes=[p.strip() for p in examples.group(1).split(",")] if examples else [],
+    )
+
+
+def _section_key(name: str) -> str:
+    # "LE VRAI PROBLÈME" -> "vrai-probleme" : l'article peut varier le déterminant
+    return _ARTICLE.sub("", slugify(name))
+
+
+def _find_section(sections: List[Section], name: str) -> Optional[Section]:
+    key = _section_key(name)
+    return next((s for s in sections if s.level >= 2 and key in s.anchor), None)
+
+
+def _count_steps(section: Section, sections: List[Section]) -> int:
+    # Étapes en liste dans la section, ou en sous-titres H3 juste en dessous
+    items = sum(1 for line in section.body if _LIST_ITEM.match(line))
+    index = sections.index(section)
+    subheadings = 0
+    for following in sections[index + 1:]:
+        if following.level <= section.level:
+            break
+        if following.level == section.level + 1:
+            subheadings += 1
+    return max(items, subheadings)
+
+
+def check_article(markdown: str, rules: PromptRules, expected_program: Optional[str] = None) -> Dict[str, bool]:
+    """Un booléen par contrôle ; les clés sont stables d'une version à l'autre."""
+    sections = split_sections(markdown)
+    headed = [s for s in sections if s.level]
+    flat = slugify(plain_text(markdown))
+    checks: Dict[str, bool] = {}
+
+    checks["titre_h1"] = bool(headed) and headed[0].level == 1 and not sections[0].text
+    intro = headed[0].body if headed and headed[0].level == 1 else []
+    intro_lines = [line for line in intro if line.strip()]
+    checks["accroche"] = 1 <= len(intro_lines) <= 5
+
+    for name in rules.sections:
+        if slugify(name) not in _NOT_HEADINGS:
+            checks[f"section_{_section_key(name).replace('-', '_')}"] = _find_section(sections, name) is not None
+
+    method = _find_section(sections, "LA MÉTHODE")
+    low, high = rules.step_range
+    checks["etapes_methode"] = method is not None and low <= _count_steps(method, sections) <= high
+
+    checks["phrase_signature"] = bool(rules.signature) and slugify(rules.signature) in flat
+    checks["cta_quiz"] = bool(rules.cta) and slugify(rules.cta) in flat
+    checks["programme_et_prix"] = any(slugify(p) in flat for p in rules.programmes) and bool(_PRICE.search(markdown))
+    if expected_program:
+        checks["programme_attendu"] = slugify(expected_program) in flat
+    return checks
+
+
+def compliance_score(checks: Dict[str, bool]) -> float:
+    return sum(checks.values()) / len(checks) if checks else 0.0
@@ -0,0 +1,36 @@
+# evaluation/blog_subjects.py
+"""
+Sujets fixes du benchmark de génération d'articles.
+Chaque sujet contient:
+- name: Identifiant court (clé des résultats et de l'enregistrement)
+- subject: Le sujet envoyé à generate_blog
+- expected_program: Le programme signature attendu dans le CTA
+"""
+
+BLOG_SUBJECTS = [
+    {
+        "name": "charge_mentale",
+        "subject": "Charge mentale : pourquoi ta to-do list ne se vide jamais",
+        "expected_program": "Reprends le contrôle",
+    },
+    {
+        "name": "prise_de_parole",
+        "subject": "Les silences : l'arme secrète des gens crédibles",
+        "expected_program": "Fais-toi entendre",
+    },
+    {
+        "name": "reconversion",
+        "subject": "Se reconvertir sans tout plaquer : la méthode des petits pas",
+        "expected_program": "Garde le cap",
+    },
+    {
+        "name": "ia_productivite",
+        "subject": "ChatGPT au travail : gagner une heure par jour sans y passer ses soirées",
+        "expected_program": "Reprends le contrôle",
+    },
+    {
+        "name": "syndrome_imposteur",
+        "subject": "Syndrome de l'imposteur en alternance : le système est obsolète, pas toi",
+        "expected_program": "Garde le cap",
+    },
+]
@@ -0,0 +1,349 @@
+# evaluation/blog_upstreams.py
+"""
+Amonts (clients Anthropic de substitution) pour le benchmark de génération
+d'articles. Tous exposent `messages.create(...)` et `messages.stream(...)`
+comme le SDK, et avancent une horloge que le benchmark lit pour mesurer le
+temps jusqu'au premier token et la latence totale :
+
+- SimulatedUpstream : modèle de latence déterministe (préremplissage, cache de
+  préfixe, débit de décodage) et article synthétique construit à partir du
+  prompt et du contexte reçus. Hors-ligne, instantané.
+- RecordingUpstream : appelle l'API réelle et enregistre texte, usage et
+  horodatage de chaque morceau dans une cassette JSON.
+- ReplayUpstream : rejoue une cassette avec les temps enregistrés.
+"""
+
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from evaluation.blog_compliance import load_rules
+
+
+CASSETTE_VERSION = 1
+
+_PROGRAMME_HEADING = re.compile(r"^###\s+([^(\n]+?)\s*\(", re.MULTILINE)
+_WORKSHOP_PRICE = re.compile(r"Atelier 1 jour[^\n]*?(\d[\d\s]*€)")
+
+
+class VirtualClock:
+    """Horloge avancée par l'amont simulé ou rejoué : aucune attente réelle."""
+
+    def __init__(self):
+        self._now = 0.0
+
+    def __call__(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        self._now += max(seconds, 0.0)
+
+
+class WallClock:
+    def __call__(self) -> float:
+        return time.perf_counter()
+
+    def advance(self, seconds: float) -> None:
+        pass
+
+
+def request_key(request: Dict, stream: bool) -> str:
+    """Empreinte d'une requête : modèle, prompt système (cache compris), messages, mode de transport."""
+    payload = {
+        "model": request["model"],
+        "system": request["system"],
+        "messages": request["messages"],
+        "stream": stream,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def _system_text(system) -> str:
+    if isinstance(system, str):
+        return system
+    return "".join(block.get("text", "") for block in system)
+
+
+def _has_cache_control(system) -> bool:
+    return not isinstance(system, str) and any("cache_control" in block for block in system)
+
+
+def _message(text: str, usage: Dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        usage=SimpleNamespace(**usage),
+    )
+
+
+class _ReplayStream:
+    """Flux rejoué : chaque morceau est émis à son décalage depuis le début de la requête."""
+
+    def __init__(self, clock, chunks: List[Tuple[float, str]], elapsed: float, usage: Dict):
+        self._clock = clock
+        self._chunks = chunks
+        self._elapsed = elapsed
+        self._usage = usage
+        self._text: List[str] = []
+
+    def __enter__(self):
+        self._start = self._clock()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        for offset, text in self._chunks:
+            self._clock.advance(self._start + offset - self._clock())
+            self._text.append(text)
+            yield text
+
+    def get_final_message(self):
+        self._clock.advance(self._start + self._elapsed - self._clock())
+        return _message("".join(self._text), self._usage)
+
+
+class _Messages:
+    def __init__(self, upstream):
+        self._upstream = upstream
+
+    def create(self, **request):
+        return self._upstream.create(request)
+
+    def stream(self, **request):
+        return self._upstream.stream(request)
+
+
+# --- Simulation ---------------------------------------------------------------
+
+class SimulatedUpstream:
+    """Amont déterministe : latence = base + préremplissage (hors cache) + décodage."""
+
+    def __init__(
+        self,
+        clock: VirtualClock,
+        base_latency: float = 0.35,
+        prefill_tokens_per_second: float = 9000.0,
+        cached_prefill_speedup: float = 10.0,
+        decode_tokens_per_second: float = 90.0,
+        min_cacheable_tokens: int = 1024,
+        chars_per_token: float = 3.5,
+    ):
+        self.clock = clock
+        self.messages = _Messages(self)
+        self.base_latency = base_latency
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.cached_prefill_speedup = cached_prefill_speedup
+        self.decode_tokens_per_second = decode_tokens_per_second
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.chars_per_token = chars_per_token
+        self._cached_prefixes = set()
+
+    def _tokens(self, text: str) -> int:
+        return max(1, round(len(text) / self.chars_per_token))
+
+    def _plan(self, request: Dict) -> Tuple[List[str], Dict, float]:
+        system = _system_text(request["system"])
+        prompt = request["messages"][0]["content"]
+        system_tokens = self._tokens(system)
+        input_tokens = system_tokens + self._tokens(prompt)
+
+        cache_read = cache_creation = 0
+        if _has_cache_control(request["system"]) and system_tokens >= self.min_cacheable_tokens:
+            digest = hashlib.sha256(system.encode("utf-8")).hexdigest()
+            if digest in self._cached_prefixes:
+                cache_read = system_tokens
+            else:
+                cache_creation = system_tokens
+                self._cached_prefixes.add(digest)
+        # Comme l'API : input_tokens ne compte que la partie hors cache
+        uncached = input_tokens - cache_read - cache_creation
+
+        lines = synthesize_article(prompt, system)
+        output_tokens = min(self._tokens("".join(lines)), request["max_tokens"])
+        ttft = (
+            self.base_latency
+            + (uncached + cache_creation) / self.prefill_tokens_per_second
+            + cache_read / (self.prefill_tokens_per_second * self.cached_prefill_speedup)
+        )
+        usage = {
+            "input_tokens": uncached,
+            "output_tokens": output_tokens,
+            "cache_creation_input_tokens": cache_creation,
+            "cache_read_input_tokens": cache_read,
+        }
+        return lines, usage, ttft
+
+    def _respond(self, request: Dict) -> Tuple[List[Tuple[float, str]], float, Dict]:
+        """(morceaux horodatés depuis le début de la requête, durée totale, usage)."""
+        lines, usage, ttft = self._plan(request)
+        chunks, offset = [], ttft
+        for line in lines:
+            chunks.append((offset, line))
+            offset += self._tokens(line) / self.decode_tokens_per_second
+        return chunks, offset, usage
+
+    def create(self, request: Dict):
+        chunks, elapsed, usage = self._respond(request)
+        self.clock.advance(elapsed)
+        return _message("".join(text for _, text in chunks), usage)
+
+    def stream(self, request: Dict):
+        chunks, elapsed, usage = self._respond(request)
+        return _ReplayStream(self.clock, chunks, elapsed, usage)
+
+
+def synthesize_article(prompt: str, system: str) -> List[str]:
+    """Article synthétique conforme à la structure du prompt.
+
+    Le programme et son prix ne sont cités que s'ils figurent dans le contexte
+    reçu : un contexte réduit sans la grille tarifaire produit un CTA incomplet,
+    comme le ferait le modèle réel à qui l'on interdit d'inventer des chiffres.
+    """
+    subject = re.search(r"sujet : \"(.+?)\"", prompt)
+    subject = subject.group(1) if subject else "ton quotidien"
+    rules = load_rules(prompt)
+    programmes = _PROGRAMME_HEADING.findall(system)
+    price = _WORKSHOP_PRICE.search(system)
+
+    lines = [
+        "# Tu n'as pas un problème de volonté, tu as un problème de méthode\n\n",
+        f"{subject} : tu t'y reconnais ? Tu fais de ton mieux et pourtant rien ne bouge.\n",
+        "Bonne nouvelle : on peut avancer à petits pas, dès aujourd'hui.\n\n",
+        "## Le vrai problème\n\n",
+        "Ce n'est pas toi qui manques de quelque chose : c'est le système qui te demande "
+        "de tout porter seul(e), sans pause ni repère.\n\n",
+        "## La bascule\n\n",
+        "Et si tu arrêtais de viser parfait pour viser possible ?\n\n",
+        "## La méthode\n\n",
+    ]
+    steps = ["Pose tout sur papier", "Choisis une seule priorité", "Bloque 10 minutes",
+             "Demande de l'aide", "Célèbre le pas fait"]
+    lines += [f"{i}. **{step}** : un geste simple, applicable en 10 minutes.\n" for i, step in enumerate(steps, 1)]
+    lines += [
+        "\n## Mini-exercice (5 minutes)\n\n",
+        "Prends une feuille, note ce qui te pèse, entoure une seule chose à faire aujourd'hui.\n\n",
+        "## Conclusion\n\n",
+        f"{rules.signature}\n\n",
+        f"👉 {rules.cta}\n",
+    ]
+    if programmes and price:
+        lines.append(f"Pour aller plus loin : le programme {programmes[0].title()} en atelier 1 jour ({price.group(1)} HT).\n")
+    return lines
+
+
+# --- Enregistrement et rejeu --------------------------------------------------
+
+class _RecordingStream:
+    def __init__(self, upstream, request: Dict, key: str):
+        self._upstream = upstream
+        self._request = request
+        self._key = key
+        self._chunks: List[Tuple[float, str]] = []
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._inner = self._upstream.client.messages.stream(**self._request)
+        self._stream = self._inner.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._inner.__exit__(*exc)
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        for text in self._stream.text_stream:
+            self._chunks.append((round(time.perf_counter() - self._start, 4), text))
+            yield text
+
+    def get_final_message(self):
+        message = self._stream.get_final_message()
+        self._upstream.remember(self._key, message, time.perf_counter() - self._start, self._chunks)
+        return message
+
+
+class RecordingUpstream:
+    """Appelle le vrai client et enregistre chaque réponse dans la cassette."""
+
+    def __init__(self, client, cassette_path: Path):
+        self.client = client
+        self.cassette_path = Path(cassette_path)
+        self.messages = _Messages(self)
+        self.entries: Dict[str, Dict] = {}
+        self.model: Optional[str] = None
+
+    def remember(self, key: str, message, elapsed: float, chunks: List[Tuple[float, str]]) -> None:
+        text = "".join(block.text for block in message.content if getattr(block, "type", None) == "text")
+        self.model = getattr(message, "model", self.model)
+        self.entries[key] = {
+            "elapsed": round(elapsed, 4),
+            "chunks": chunks or [(round(elapsed, 4), text)],
+            "usage": {
+                field: getattr(message.usage, field, None) or 0
+                for field in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+            },
+        }
+
+    def create(self, request: Dict):
+        start = time.perf_counter()
+        message = self.client.messages.create(**request)
+        self.remember(request_key(request, stream=False), message, time.perf_counter() - start, [])
+        return message
+
+    def stream(self, request: Dict):
+        return _RecordingStream(self, request, request_key(request, stream=True))
+
+    def save(self) -> None:
+        # Fusion avec une cassette existante : on peut enregistrer mode par mode
+        existing = load_cassette(self.cassette_path) if self.cassette_path.exists() else {"entries": {}}
+        existing["entries"].update(self.entries)
+        cassette = {
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "model": self.model or existing.get("model"),
+            "entries": existing["entries"],
+        }
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cassette_path.write_text(json.dumps(cassette, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+class CassetteMiss(KeyError):
+    """Requête absente de la cassette (prompt, contexte ou modèle modifiés depuis l'enregistrement)."""
+
+
+def load_cassette(path: Path) -> Dict:
+    cassette = json.loads(Path(path).read_text(encoding="utf-8"))
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Version de cassette non supportée: {cassette.get('version')}")
+    return cassette
+
+
+class ReplayUpstream:
+    """Rejoue une cassette : mêmes textes, usage et temps que lors de l'enregistrement."""
+
+    def __init__(self, clock: VirtualClock, cassette_path: Path):
+        self.clock = clock
+        self.messages = _Messages(self)
+        self.cassette = load_cassette(cassette_path)
+
+    def _entry(self, request: Dict, stream: bool) -> Dict:
+        key = request_key(request, stream)
+        if key not in self.cassette["entries"]:
+            raise CassetteMiss(f"Requête {key} absente de la cassette : ré-enregistrer avec --upstream record")
+        return self.cassette["entries"][key]
+
+    def create(self, request: Dict):
+        entry = self._entry(request, stream=False)
+        self.clock.advance(entry["elapsed"])
+        return _message("".join(text for _, text in entry["chunks"]), entry["usage"])
+
+    def stream(self, request: Dict):
+        entry = self._entry(request, stream=True)
+        chunks = [(offset, text) for offset, text in entry["chunks"]]
+        return _ReplayStream(self.clock, chunks, entry["elapsed"], entry["usage"])
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+evaluation/compare_output_modes.py
+
+Compare la sortie complète (le modèle rédige RecommendationOutput) et la sortie
+compacte (identifiants du catalogue + phrases courtes, étendus côté serveur) :
+tokens de sortie, latence et programme recommandé, sur les cas de test du quiz.
+
+Usage: python evaluation/compare_output_modes.py [nb_cas]
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List
+
+# Ajouter le path parent pour les imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from app.agents.quiz.logic import invoke_recommendation
+from evaluation.test_cases import TEST_CASES
+
+
+def measure(answers: Dict[str, str], compact: bool) -> Dict:
+    start = time.perf_counter()
+    res, usage, _ = invoke_recommendation(answers, compact=compact)
+    return {
+        "latency": time.perf_counter() - start,
+        "output_tokens": usage.get("output_tokens", 0),
+        "input_tokens": usage.get("input_tokens", 0),
+        "program": res.principal_program.name,
+    }
+
+
+def summarize(label: str, rows: List[Dict]):
+    n = len(rows)
+    print(f"   {label:<8} tokens sortie moy.: {sum(r['output_tokens'] for r in rows) / n:7.1f}   "
+          f"latence moy.: {sum(r['latency'] for r in rows) / n:5.2f} s   "
+          f"tokens entrée moy.: {sum(r['input_tokens'] for r in rows) / n:7.1f}")
+
+
+def main():
+    load_dotenv()
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else len(TEST_CASES)
+    cases = TEST_CASES[:limit]
+
+    print("=" * 60)
+    print("⚖️  SORTIE COMPLÈTE vs SORTIE COMPACTE")
+    print("=" * 60)
+
+    results = {"full": [], "compact": []}
+    for case in cases:
+        print(f"\n📝 {case['name']}")
+        for mode in ("full", "compact"):
+            row = measure(case["answers"], compact=(mode == "compact"))
+            results[mode].append(row)
+            print(f"   {mode:<8} {row['output_tokens']:5d} tokens  {row['latency']:5.2f} s  → {row['program']}")
+
+    print("\n" + "─" * 60)
+    summarize("full", results["full"])
+    summarize("compact", results["compact"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Lu à l'import de l'application : les tests n'écrivent jamais dans le stockage réel
+os.environ.setdefault("QUIZ_STORAGE_DIR", tempfile.mkdtemp(prefix="quiz-storage-"))
+os.environ.setdefault("BLOG_STORAGE_DIR", tempfile.mkdtemp(prefix="blog-storage-"))
@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.agents.blogBot.artifacts import ArtifactBuilder, build_artifacts, slugify
+from app.agents.blogBot.refresh import split_sections
+from app.agents.blogBot.store import ArticleStore
+
+
+ARTICLE = """# Tu n'as pas un problème de temps, tu as un problème de clarté
+
+Tu cours toute la journée et pourtant rien n'avance. Voici comment reprendre le contrôle en 10 minutes par jour.
+
+## Le vrai problème
+Ta charge mentale <script>alert(1)</script> déborde. Voir [le quiz](https://cozetik.fr/quiz) ou [ça](javascript:void).
+
+## La méthode
+1. Étape **une**
+2. Étape `deux`
+
+### Mini-exercice
+- Respire
+
+## La méthode
+
+> On ne se forme pas pour ajouter une couche.
+"""
+
+
+def test_html_is_sanitized_and_rendered():
+    html = build_artifacts(ARTICLE).html
+
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+    assert '<a href="https://cozetik.fr/quiz">le quiz</a>' in html
+    assert 'href="javascript' not in html
+    assert "<ol>\n<li>Étape <strong>une</strong></li>\n<li>Étape <code>deux</code></li>\n</ol>" in html
+    assert "<blockquote><p>On ne se forme pas pour ajouter une couche.</p></blockquote>" in html
+
+
+def test_toc_anchors_are_unique_and_match_html():
+    artifacts = build_artifacts(ARTICLE)
+
+    assert [(e.level, e.anchor) for e in artifacts.toc] == [
+        (2, "le-vrai-probleme"),
+        (2, "la-methode"),
+        (3, "mini-exercice"),
+        (2, "la-methode-2"),
+    ]
+    for entry in artifacts.toc:
+        assert f'id="{entry.anchor}"' in artifacts.html
+
+
+def test_anchor_suffix_never_collides_with_existing_heading():
+    markdown = "## Intro\n\n## Intro\n\n## Intro 2\n\n## Intro 2\n"
+    anchors = [e.anchor for e in build_artifacts(markdown).toc]
+
+    assert anchors == ["intro", "intro-2", "intro-2-2", "intro-2-3"]
+    # Le découpage du rafraîchissement attribue les mêmes ancres que le rendu
+    assert [s.anchor for s in split_sections(markdown) if s.level] == anchors
+
+
+def test_seo_metadata():
+    seo = build_artifacts(ARTICLE, subject="Charge mentale", published_at="2026-01-01").seo
+
+    assert seo.title_candidates[0] == "Tu n'as pas un problème de temps, tu as un problème de clarté"
+    assert all(len(t) <= 61 for t in seo.title_candidates[1:])
+    assert seo.meta_description.startswith("Tu cours toute la journée")
+    assert len(seo.meta_description) <= 155
+    assert seo.reading_time_minutes == 1
+    assert seo.json_ld["@type"] == "BlogPosting"
+    assert seo.json_ld["datePublished"] == "2026-01-01"
+    assert "dateModified" not in seo.json_ld
+    assert build_artifacts(ARTICLE, modified_at="2026-02-01").seo.json_ld["dateModified"] == "2026-02-01"
+
+
+def test_streamed_chunks_match_single_pass():
+    builder = ArtifactBuilder()
+    for i in range(0, len(ARTICLE), 7):
+        builder.feed(ARTICLE[i:i + 7])
+
+    assert builder.finish() == build_artifacts(ARTICLE)
+
+
+def test_slugify_strips_accents():
+    assert slugify("La Méthode (3 étapes)") == "la-methode-3-etapes"
+
+
+def test_generate_stores_artifacts_and_honours_include(tmp_path, monkeypatch):
+    import app.agents.blogBot.main as blog_main
+
+    monkeypatch.setattr(main_module, "article_store", ArticleStore(tmp_path))
+    monkeypatch.setattr(
+        blog_main, "generate_blog",
+        lambda subject, with_metadata=True, context=None: (ARTICLE, {"model": "test", "scores": {"cta_impact": 0.9}, "sources": []}),
+    )
+    client = TestClient(main_module.app)
+
+    response = client.post("/api/v1/generate?include=toc,seo", json={"subject": "Charge mentale"})
+    assert response.status_code == 200
+    data = response.json()
+    assert "html" not in data
+    assert data["toc"][0]["anchor"] == "le-vrai-probleme"
+    assert data["seo"]["json_ld"]["@type"] == "BlogPosting"
+    stored = main_module.article_store.get(data["article_id"])
+    assert data["seo"]["json_ld"]["datePublished"] == stored.created_at
+
+    cached = client.get(f"/api/v1/articles/{data['article_id']}?include=html").json()
+    assert cached["markdown"] == ARTICLE
+    assert cached["html"].startswith("<h1")
+    assert "toc" not in cached
+
+    assert client.post("/api/v1/generate?include=pdf", json={"subject": "x"}).status_code == 422
+    assert client.get("/api/v1/articles/../etc").status_code == 404
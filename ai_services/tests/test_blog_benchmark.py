@@ -0,0 +1,66 @@
+import evaluation.benchmark_blog_generation as bench
+from app.agents.blogBot.main import build_system_prompt, load_cozetik_context, load_prompt
+from evaluation.benchmark_blog_generation import compare_runs, mode_report, run_benchmark
+from evaluation.blog_compliance import check_article, compliance_score, load_rules
+from evaluation.blog_subjects import BLOG_SUBJECTS
+from evaluation.blog_upstreams import RecordingUpstream, SimulatedUpstream, VirtualClock, synthesize_article
+
+
+def _article():
+    prompt = load_prompt("blog_system_prompt.txt").replace("{subject}", "Charge mentale")
+    return "".join(synthesize_article(prompt, build_system_prompt(load_cozetik_context())))
+
+
+def test_rules_are_read_from_prompt():
+    rules = load_rules()
+    assert "LA MÉTHODE" in rules.sections and "MINI-EXERCICE" in rules.sections
+    assert rules.signature.startswith("On ne se forme pas")
+    assert rules.cta.startswith("Fais le Quiz Cozetik")
+    assert rules.step_range == (3, 7)
+
+
+def test_compliance_checks_detect_missing_elements():
+    rules = load_rules()
+    article = _article()
+    checks = check_article(article, rules, expected_program="Reprends le contrôle")
+    assert compliance_score(checks) == 1.0
+
+    broken = article.replace(rules.signature, "").replace("## La bascule", "## Autre chose")
+    checks = check_article(broken, rules)
+    assert not checks["phrase_signature"] and not checks["section_bascule"]
+    assert checks["cta_quiz"] and checks["etapes_methode"]
+
+
+def test_simulated_modes_measure_ttft_and_cache():
+    modes = ["full-uncached-sync", "full-cached-stream", "reduced-uncached-stream"]
+    run = run_benchmark("simulated", BLOG_SUBJECTS[:2], modes, repeat=1, cassette=None)
+    summaries = {mode: data["summary"] for mode, data in run["modes"].items()}
+
+    sync, cached, reduced = (summaries[m] for m in modes)
+    # En un bloc, le premier token arrive avec le dernier
+    assert sync["ttft_s"]["mean"] == sync["total_s"]["mean"]
+    assert cached["ttft_s"]["mean"] < sync["ttft_s"]["mean"]
+    # Premier appel : écriture du cache, second : lecture
+    assert [r["cache_creation_input_tokens"] > 0 for r in run["modes"][modes[1]]["runs"]] == [True, False]
+    assert cached["cache_hit_ratio"] > 0
+    assert reduced["input_tokens"]["mean"] < sync["input_tokens"]["mean"]
+    assert "full-cached-stream" in mode_report(run)
+
+
+def test_replay_reproduces_recording_and_compares(tmp_path, monkeypatch):
+    cassette = tmp_path / "cassette.json"
+    # Enregistrement d'un amont simulé : pas d'appel réseau
+    recorder = RecordingUpstream(SimulatedUpstream(VirtualClock()), cassette)
+    monkeypatch.setattr(bench, "make_upstream", lambda kind, path: (recorder, recorder.client.clock))
+    recorded = run_benchmark("record", BLOG_SUBJECTS[:1], ["full-uncached-stream"], 1, cassette)
+    monkeypatch.undo()
+
+    replayed = run_benchmark("replay", BLOG_SUBJECTS[:1], ["full-uncached-stream"], 1, cassette)
+    before = recorded["modes"]["full-uncached-stream"]["runs"][0]
+    after = replayed["modes"]["full-uncached-stream"]["runs"][0]
+    assert after["output_tokens"] == before["output_tokens"]
+    assert after["checks"] == before["checks"]
+
+    report = compare_runs(recorded, replayed)
+    assert "Amont : record → replay" in report
+    assert "| full-uncached-stream | Tokens sortie |" in report
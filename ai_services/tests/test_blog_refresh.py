@@ -0,0 +1,172 @@
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.agents.blogBot.refresh as refresh
+from app.agents.blogBot.main import DATA_DIR
+from app.agents.blogBot.artifacts import build_artifacts
+from app.agents.blogBot.refresh import (
+    SectionNotFound,
+    find_stale_articles,
+    match_sections,
+    regenerate_sections,
+    removed_facts,
+    split_sections,
+)
+from app.agents.blogBot.store import ArticleStore
+
+
+ARTICLE = """# Reprends le contrôle
+
+Accroche.
+
+## La méthode
+1. Une étape
+
+## Mini-exercice
+Respire.
+
+## CTA
+Fais le Quiz Cozetik (2 min). Atelier 1 jour : **990 € HT**.
+"""
+
+OFFRES = "### REPRENDS LE CONTRÔLE\n- Atelier 1 jour (7h) : **990€ HT**\n- Parcours 21h : **2 490€ HT**\n"
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "tech_com_offres.txt").write_text(OFFRES, encoding="utf-8")
+    (data_dir / "01_identite_cozetik.txt").write_text("Cozetik.", encoding="utf-8")
+    monkeypatch.setattr(refresh, "DATA_DIR", data_dir)
+    return data_dir
+
+
+def _store_article(store, markdown=ARTICLE):
+    return store.save(
+        subject="Charge mentale",
+        markdown=markdown,
+        artifacts=build_artifacts(markdown),
+        model="test",
+        scores={},
+        sources=[],
+        corpus_versions=refresh.snapshot_corpus(store),
+    )
+
+
+def test_split_and_match_sections():
+    sections = split_sections(ARTICLE)
+    assert [s.anchor for s in sections] == ["", "reprends-le-controle", "la-methode", "mini-exercice", "cta"]
+    assert [s.anchor for s in match_sections(sections, ["CTA", "LA MÉTHODE"])] == ["cta", "la-methode"]
+    # Déterminant initial facultatif, mais jamais de correspondance partielle
+    assert [s.anchor for s in match_sections(sections, ["méthode"])] == ["la-methode"]
+    for name in ["FAQ", "e", "exercice"]:
+        with pytest.raises(SectionNotFound):
+            match_sections(sections, [name])
+    with pytest.raises(SectionNotFound):
+        match_sections(split_sections("## La méthode\n\n## Les méthode\n"), ["méthode"])
+
+
+def test_regenerate_only_requested_sections(tmp_path, corpus):
+    store = ArticleStore(tmp_path / "storage")
+    article = _store_article(store)
+    prompts = []
+
+    def fake_complete(system, prompt, decision):
+        prompts.append(prompt)
+        return "@@@ cta\nFais le Quiz Cozetik (2 min). Atelier 1 jour : **1 090€ HT**.\n"
+
+    updated, diffs, decision = regenerate_sections(article, ["CTA"], store, complete=fake_complete)
+
+    assert decision.endpoint == "blog_refresh"
+    assert "- cta (titre : CTA)" in prompts[0] and "## La méthode" in prompts[0]
+    assert "1 090€" in updated.markdown
+    assert "## La méthode\n1. Une étape\n\n## Mini-exercice\nRespire." in updated.markdown
+    assert [d.anchor for d in diffs] == ["cta"]
+    assert any(line.startswith("+") and "1 090€" in line for line in diffs[0].diff)
+    stored = store.get(article.article_id)
+    assert stored.updated_at is not None
+    assert 'id="cta"' in stored.artifacts.html
+    assert stored.artifacts.seo.json_ld["datePublished"] == article.created_at
+    assert stored.artifacts.seo.json_ld["dateModified"] == stored.updated_at
+
+
+def test_partial_refresh_keeps_article_stale_while_a_section_cites_removed_price(tmp_path, corpus):
+    store = ArticleStore(tmp_path / "storage")
+    article = _store_article(store, ARTICLE.replace("1. Une étape", "1. Une étape (atelier à 990 €)"))
+    (corpus / "tech_com_offres.txt").write_text(OFFRES.replace("990€", "1 090€", 1), encoding="utf-8")
+
+    def fake_complete(system, prompt, decision):
+        anchor = "cta" if "- cta " in prompt else "la-methode"
+        return f"@@@ {anchor}\nNouveau contenu : **1 090€ HT**.\n"
+
+    article, _, _ = regenerate_sections(article, ["CTA"], store, complete=fake_complete)
+    assert [(s.article_id, s.sections) for s in find_stale_articles(store)] == [(article.article_id, ["La méthode"])]
+
+    regenerate_sections(article, ["LA MÉTHODE"], store, complete=fake_complete)
+    assert find_stale_articles(store) == []
+
+
+def test_generate_records_the_corpus_sent_to_the_model(tmp_path, corpus, monkeypatch):
+    import app.agents.blogBot.main as blog_main
+    import app.main as main_module
+
+    monkeypatch.setattr(main_module, "article_store", ArticleStore(tmp_path / "storage"))
+    seen = {}
+
+    def fake_generate(subject, with_metadata=True, context=None):
+        seen["context"] = context
+        # Corpus modifié pendant la génération : l'article reste lié à la version envoyée
+        (corpus / "tech_com_offres.txt").write_text("Nouveaux tarifs.", encoding="utf-8")
+        return ARTICLE, {"model": "test", "scores": {}, "sources": []}
+
+    monkeypatch.setattr(blog_main, "generate_blog", fake_generate)
+    article_id = TestClient(main_module.app).post("/api/v1/generate", json={"subject": "x"}).json()["article_id"]
+
+    stored = main_module.article_store.get(article_id)
+    assert "990€" in seen["context"]
+    assert stored.corpus_versions["tech_com_offres.txt"] == hashlib.sha256(OFFRES.encode("utf-8")).hexdigest()
+
+
+def test_removed_facts_ignores_prices_still_offered():
+    old = "- Atelier : **990€ HT**\n- Parcours : **2 490€ HT**\n> « Fais le Quiz Cozetik (2 min) »\n"
+    new = "- Atelier : **1 090€ HT**\n- Parcours : **2 490€ HT**\n> « Fais le Quiz Cozetik (2 min) »\n"
+    assert removed_facts(old, new) == ["990€"]
+
+
+def test_price_change_detected_in_real_offers_file(tmp_path, corpus):
+    real = (DATA_DIR / "tech_com_offres.txt").read_text(encoding="utf-8")
+    line = "- Atelier 1 jour (7h) : **990€ HT**"
+    # Le même montant reste affiché pour une autre offre (TRACER SA ROUTE 14h)
+    assert line in real and "14h : 990€ HT" in real
+    changed = real.replace(line, "- Atelier 1 jour (7h) : **1 090€ HT**")
+
+    assert removed_facts(real, changed) == ["990€"]
+    assert removed_facts(real, real) == []
+
+    (corpus / "tech_com_offres.txt").write_text(real, encoding="utf-8")
+    store = ArticleStore(tmp_path / "storage")
+    article = _store_article(store)
+    (corpus / "tech_com_offres.txt").write_text(changed, encoding="utf-8")
+
+    stale = find_stale_articles(store, ["tech_com_offres.txt"])
+    assert [(s.article_id, s.sections) for s in stale] == [(article.article_id, ["CTA"])]
+
+
+def test_find_stale_articles_after_price_change(tmp_path, corpus):
+    store = ArticleStore(tmp_path / "storage")
+    impacted = _store_article(store)
+    untouched = _store_article(store, markdown="# Autre\n\n## CTA\nFais le Quiz Cozetik.\n")
+
+    assert find_stale_articles(store) == []
+
+    (corpus / "tech_com_offres.txt").write_text(OFFRES.replace("990€", "1 090€", 1), encoding="utf-8")
+
+    stale = find_stale_articles(store, ["tech_com_offres.txt"])
+    assert [(s.article_id, s.changed_files, s.sections) for s in stale] == [
+        (impacted.article_id, ["tech_com_offres.txt"], ["CTA"])
+    ]
+    assert untouched.article_id not in {s.article_id for s in stale}
+    assert find_stale_articles(store, ["01_identite_cozetik.txt"]) == []
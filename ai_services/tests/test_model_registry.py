@@ -0,0 +1,130 @@
+import pytest
+
+from app.agents.quiz.logic import quiz_complexity
+from app.model_registry import ModelRouter, RegistryConfig, load_registry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _router(clock=None):
+    return ModelRouter(RegistryConfig.model_validate({
+        "models": {"fast": {"id": "model-fast"}, "strong": {"id": "model-strong"}},
+        "endpoints": {
+            "quiz": {
+                "temperature": 0,
+                "max_tokens": 2048,
+                "compact_max_tokens": 512,
+                "tiers": {"simple": ["fast"], "complex": ["strong", "fast"]},
+            },
+        },
+        "routing": {
+            "window": 10,
+            "min_samples": 3,
+            "max_error_rate": 0.5,
+            "max_sample_age_seconds": 60,
+            "latency_budget_seconds": {"quiz": 5},
+        },
+    }), clock=clock or FakeClock())
+
+
+def test_default_registry_loads():
+    registry = load_registry()
+    assert {"quiz", "blog", "blog_refresh"} <= set(registry.endpoints)
+
+
+def test_unknown_model_in_tier_is_rejected():
+    with pytest.raises(ValueError):
+        RegistryConfig.model_validate({
+            "models": {"fast": {"id": "x"}},
+            "endpoints": {"quiz": {"temperature": 0, "max_tokens": 10, "tiers": {"simple": ["nope"]}}},
+        })
+
+
+def test_complexity_picks_tier():
+    router = _router()
+
+    simple = router.route("quiz", "simple", "profil net")
+    complex_ = router.route("quiz", "complex", "profil mixte")
+
+    assert (simple.model_id, simple.compact_max_tokens) == ("model-fast", 512)
+    assert complex_.model_id == "model-strong"
+    assert complex_.reason.startswith("profil mixte, niveau complex")
+
+
+def test_failing_model_is_skipped():
+    router = _router()
+    strong = router.route("quiz", "complex")
+    for _ in range(3):
+        router.record(strong, 1.0, ok=False)
+
+    decision = router.route("quiz", "complex")
+
+    assert decision.model_id == "model-fast"
+    assert "strong écarté" in decision.reason
+
+
+def test_slow_model_falls_back_to_faster_candidate():
+    router = _router()
+    strong = router.route("quiz", "complex")
+    fast = router.route("quiz", "simple")
+    for _ in range(3):
+        router.record(strong, 9.0, ok=True)
+        router.record(fast, 2.0, ok=True)
+
+    decision = router.route("quiz", "complex")
+
+    assert decision.model_id == "model-fast"
+    assert "hors budget" in decision.reason
+
+
+def test_skipped_model_is_retried_once_errors_expire():
+    clock = FakeClock()
+    router = _router(clock)
+    strong = router.route("quiz", "complex")
+    for _ in range(3):
+        router.record(strong, 1.0, ok=False)
+    assert router.route("quiz", "complex").model_id == "model-fast"
+
+    clock.now += 61
+    decision = router.route("quiz", "complex")
+
+    assert decision.model_id == "model-strong"
+    assert "écarté" not in decision.reason
+    assert router.snapshot()["quiz/strong"]["samples"] == 0
+
+
+def test_slow_model_falls_back_to_unmeasured_candidate():
+    router = _router()
+    strong = router.route("quiz", "complex")
+    for _ in range(3):
+        router.record(strong, 9.0, ok=True)
+
+    decision = router.route("quiz", "complex")
+
+    assert decision.model_id == "model-fast"
+    assert "strong hors budget" in decision.reason
+    assert "fast (pas encore de mesure)" in decision.reason
+
+
+def test_track_records_errors():
+    router = _router()
+    decision = router.route("quiz", "simple")
+    with pytest.raises(RuntimeError):
+        with router.track(decision):
+            raise RuntimeError("boom")
+
+    assert router.snapshot()["quiz/fast"]["error_rate"] == 1.0
+
+
+def test_quiz_complexity_signal():
+    clear = {f"q{i}": "B. x" for i in range(1, 8)}
+    mixed = {"q1": "B. x", "q2": "C. x", "q3": "B. x", "q4": "C. x"}
+
+    assert quiz_complexity(clear)[0] == "simple"
+    assert quiz_complexity(mixed) == ("complex", "profil mixte (B/C, écart 0)")
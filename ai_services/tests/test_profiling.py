@@ -0,0 +1,101 @@
+import os
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.profiling import ProfilingMiddleware, check_admin_token, list_profiles, prune_profiles, resolve_profile_path
+
+
+def _make_client(tmp_path, sample_rate=0.0, max_files=200, threads=None):
+    app = FastAPI()
+
+    @app.post("/api/recommander")
+    async def recommander():
+        if threads is not None:
+            threads["handler"] = threading.current_thread()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=tmp_path,
+        admin_token="secret",
+        sample_rate=sample_rate,
+        max_files=max_files,
+    )
+    return TestClient(app)
+
+
+def test_profile_written_with_admin_header(tmp_path):
+    client = _make_client(tmp_path)
+
+    response = client.post("/api/recommander", headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+    names = {p["name"] for p in list_profiles(tmp_path)}
+    assert names == {f"{profile_id}.html", f"{profile_id}.speedscope.json"}
+
+
+def test_no_profile_without_header_or_on_other_paths(tmp_path):
+    client = _make_client(tmp_path)
+
+    assert "x-profile-id" not in client.post("/api/recommander").headers
+    assert "x-profile-id" not in client.post("/api/recommander", headers={"X-Profile-Token": "wrong"}).headers
+    assert "x-profile-id" not in client.get("/health", headers={"X-Profile-Token": "secret"}).headers
+    assert list_profiles(tmp_path) == []
+
+
+def test_sampling_profiles_every_request_at_100_percent(tmp_path):
+    client = _make_client(tmp_path, sample_rate=100)
+
+    assert "x-profile-id" in client.post("/api/recommander").headers
+
+
+def test_profile_path_and_token_guards(tmp_path):
+    (tmp_path / "p.html").write_text("<html></html>")
+
+    assert resolve_profile_path("p.html", tmp_path) == tmp_path / "p.html"
+    assert resolve_profile_path("../p.html", tmp_path) is None
+    assert resolve_profile_path("p.txt", tmp_path) is None
+    assert not check_admin_token("secret", admin_token="")
+    assert check_admin_token("secret", admin_token="secret")
+
+
+def test_profile_rendered_off_the_event_loop(tmp_path, monkeypatch):
+    threads = {}
+    original = ProfilingMiddleware._write
+
+    def recording_write(self, profiler, profile_id):
+        threads["write"] = threading.current_thread()
+        original(self, profiler, profile_id)
+
+    monkeypatch.setattr(ProfilingMiddleware, "_write", recording_write)
+    client = _make_client(tmp_path, threads=threads)
+
+    client.post("/api/recommander", headers={"X-Profile-Token": "secret"})
+
+    assert threads["write"] is not threads["handler"]
+
+
+def test_old_profiles_pruned_after_each_write(tmp_path):
+    client = _make_client(tmp_path, max_files=2)
+
+    client.post("/api/recommander", headers={"X-Profile-Token": "secret"})
+    latest = client.post("/api/recommander", headers={"X-Profile-Token": "secret"}).headers["x-profile-id"]
+
+    assert {p["name"] for p in list_profiles(tmp_path)} == {f"{latest}.html", f"{latest}.speedscope.json"}
+
+
+def test_prune_profiles_keeps_most_recent(tmp_path):
+    for age, name in enumerate(["c.html", "b.html", "a.html"]):
+        path = tmp_path / name
+        path.write_text("<html></html>")
+        os.utime(path, (1000 - age, 1000 - age))
+
+    assert prune_profiles(1, tmp_path) == 2
+    assert [p["name"] for p in list_profiles(tmp_path)] == ["c.html"]
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import app.agents.quiz.batch as batch_module
+from app.agents.quiz.batch import parse_batch_csv, stream_batch
+from app.agents.quiz.logic import canonicalize_answers
+from app.agents.quiz.schemas import BatchQuizItem, FormationDetails, RecommendationOutput
+from app.agents.quiz.speculation import estimate_profile
+from app.main import app
+
+
+PROGRAMMES = {"A": "Prise de Parole", "B": "IA & Productivité — ChatGPT Pro"}
+
+
+def _fake_runner(calls):
+    def runner(answers):
+        calls.append(answers)
+        letter, _ = estimate_profile(answers)
+        if letter == "C":
+            raise RuntimeError("upstream down")
+        return RecommendationOutput(
+            profil_letter=letter,
+            profil_analysis="Analyse",
+            principal_program=FormationDetails(name=PROGRAMMES[letter], reason="Raison"),
+            complementary_modules=[FormationDetails(name="LinkedIn professionnel", reason="Raison")],
+            motivation_message="Go",
+        )
+    return runner
+
+
+def _collect(items, runner):
+    async def run():
+        return [line async for line in stream_batch(items, runner=runner, concurrency=2)]
+    return asyncio.run(run())
+
+
+def test_canonical_form_ignores_wording_and_order():
+    a = {"q10": "B. Efficacité", "q2": "A.  Perds tes mots"}
+    b = {"q2": "A. Perds tes mots ou tu parles trop vite", "q10": "B) Efficacité / structure"}
+    assert canonicalize_answers(a) == canonicalize_answers(b) == (("q2", "A"), ("q10", "B"))
+
+
+def test_stream_dedupes_and_keeps_input_order():
+    calls = []
+    items = [
+        BatchQuizItem(id="alice", answers={"q1": "B. x", "q2": "B. y"}),
+        BatchQuizItem(id="bob", answers={"q1": "A. x", "q2": "A. y"}),
+        BatchQuizItem(id="carol", answers={"q2": "B. autre texte", "q1": "B. x"}),
+        BatchQuizItem(id="dan", answers={"q1": "C. x"}),
+    ]
+
+    lines = _collect(items, _fake_runner(calls))
+
+    assert len(calls) == 3
+    assert [line["id"] for line in lines[:-1]] == ["alice", "bob", "carol", "dan"]
+    assert lines[2]["recommendation"]["profil_letter"] == "B"
+    assert lines[3]["error"] == "upstream down"
+
+    summary = lines[-1]
+    assert summary["type"] == "summary"
+    assert summary["total"] == 4 and summary["unique_answer_sets"] == 3 and summary["errors"] == 1
+    assert summary["profile_distribution"] == {"B": 2, "A": 1}
+    assert summary["programme_counts"]["IA & Productivité — ChatGPT Pro"] == 2
+    assert summary["complementary_module_counts"] == {"LinkedIn professionnel": 3}
+
+
+def test_parse_csv():
+    items = parse_batch_csv("\ufeffid,q1,q2\nalice,B. x,A. y\n,A. x,\n,,\n")
+    assert [(i.id, i.answers) for i in items] == [("alice", {"q1": "B. x", "q2": "A. y"}), (None, {"q1": "A. x"})]
+
+
+def test_batch_endpoint_requires_token(monkeypatch):
+    calls = []
+    monkeypatch.setattr(batch_module, "_invoke_recommendation", _fake_runner(calls))
+    client = TestClient(app, headers={"X-Batch-Token": "secret"})
+    body = json.dumps([{"answers": {"q1": "B. x"}}])
+
+    # Sans QUIZ_BATCH_TOKEN configuré, l'endpoint reste fermé
+    monkeypatch.setattr(batch_module, "BATCH_TOKEN", "")
+    assert client.post("/api/recommander/batch", content=body).status_code == 403
+
+    monkeypatch.setattr(batch_module, "BATCH_TOKEN", "secret")
+    assert client.post("/api/recommander/batch", content=body, headers={"X-Batch-Token": "wrong"}).status_code == 403
+    assert calls == []
+
+
+def test_batch_endpoint_streams_ndjson(monkeypatch):
+    monkeypatch.setattr(batch_module, "_invoke_recommendation", _fake_runner([]))
+    monkeypatch.setattr(batch_module, "BATCH_TOKEN", "secret")
+    client = TestClient(app, headers={"X-Batch-Token": "secret"})
+
+    response = client.post(
+        "/api/recommander/batch",
+        content="id,q1\nalice,B. x\nbob,A. x\n",
+        headers={"content-type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line.get("id") for line in lines] == ["alice", "bob", None]
+    assert lines[-1]["profile_distribution"] == {"B": 1, "A": 1}
+
+    assert client.post("/api/recommander/batch", json=[]).status_code == 422
+    assert client.post("/api/recommander/batch", content="nope", headers={"content-type": "application/json"}).status_code == 422
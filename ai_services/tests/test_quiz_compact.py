@@ -0,0 +1,93 @@
+import os
+
+from app.agents.quiz.catalogue import expand_recommendation, load_catalogue, parse_catalogue
+from app.agents.quiz.logic import build_quiz_prompt
+from app.agents.quiz.schemas import CompactRecommendation
+
+
+CONTEXT_PATH = os.path.join(os.path.dirname(__file__), "..", "app", "agents", "quiz", "context.txt")
+
+
+def _compact(**overrides):
+    fields = dict(
+        profil="B",
+        programme_id="P1",
+        module_ids=["B1", "D1"],
+        analyse="Tu es débordé mais motivé.",
+        raison_programme="Pour gagner une heure par jour.",
+        raisons_modules=["Pour produire plus vite.", "Pour mieux déléguer."],
+        motivation="Un petit pas aujourd'hui.",
+    )
+    fields.update(overrides)
+    return CompactRecommendation(**fields)
+
+
+def test_catalogue_parsed_from_context():
+    catalogue = load_catalogue(CONTEXT_PATH)
+
+    assert [p.name for p in catalogue.programmes][:2] == [
+        "IA & Productivité — ChatGPT Pro",
+        "Prise de Parole — Charisme, Clarté & Confiance",
+    ]
+    assert catalogue.get("p4").name == "Intelligence Émotionnelle"
+    assert catalogue.get("A1").name == "Communication professionnelle & personnelle"
+    assert catalogue.get("E2").name == "LinkedIn professionnel"
+    # Les programmes signature ne sont pas dupliqués en modules
+    assert all("Signature" not in m.name for m in catalogue.modules)
+
+
+def test_default_programme_follows_decision_rules():
+    catalogue = load_catalogue(CONTEXT_PATH)
+
+    names = {letter: catalogue.programme_for_profile(letter).name.split(" —")[0] for letter in "ABCDEFGH"}
+    assert names == {
+        "A": "Prise de Parole",
+        "B": "IA & Productivité",
+        "C": "Intelligence Émotionnelle",
+        "D": "Prise de Parole",
+        "E": "Prise de Parole",
+        "F": "IA & Productivité",
+        "G": "IA & Productivité",
+        "H": "Kizomba Bien-Être & Connexion",
+    }
+
+
+def test_default_programme_read_from_edited_rules():
+    with open(CONTEXT_PATH, "r") as f:
+        text = f.read()
+    edited = text.replace('8. DOMINANTE G (Créateur) ->\n   - Signature recommandée: "IA & Productivité"',
+                          '8. DOMINANTE G (Créateur) ->\n   - Signature recommandée: "Kizomba Bien-être"')
+    assert edited != text
+
+    assert parse_catalogue(edited).programme_for_profile("G").pole == "H"
+
+
+def test_expansion_restores_full_contract():
+    res = expand_recommendation(_compact(), load_catalogue(CONTEXT_PATH))
+
+    assert res.profil_letter == "B"
+    assert res.principal_program.name == "IA & Productivité — ChatGPT Pro"
+    assert res.principal_program.reason == "Pour gagner une heure par jour."
+    assert [(m.name, m.reason) for m in res.complementary_modules] == [
+        ("IA Créative", "Pour produire plus vite."),
+        ("Collaboration moderne", "Pour mieux déléguer."),
+    ]
+
+
+def test_expansion_falls_back_on_unknown_ids():
+    res = expand_recommendation(
+        _compact(profil="C", programme_id="Z9", module_ids=["C2", "nope"]),
+        load_catalogue(CONTEXT_PATH),
+    )
+
+    assert res.principal_program.name == "Intelligence Émotionnelle"
+    assert [m.name for m in res.complementary_modules] == ["Stress & conflits"]
+
+
+def test_compact_prompt_replaces_full_json_instructions():
+    prompt = build_quiz_prompt(CONTEXT_PATH, {"q1": "B. x"}, compact=True)
+
+    assert "P1 = IA & Productivité — ChatGPT Pro" in prompt
+    assert '"profil_analysis"' not in prompt
+    assert prompt.endswith("Voici Les Reponses du candidat:\nq1:B. x")
+    assert '"profil_analysis"' in build_quiz_prompt(CONTEXT_PATH, {"q1": "B. x"})
@@ -0,0 +1,128 @@
+import os
+import threading
+
+from app.agents.quiz.pattern_log import RECORD, PatternLog, decode_pattern, encode_pattern
+from app.agents.quiz.prewarm import in_off_peak_window, run, select_patterns
+from app.agents.quiz.schemas import FormationDetails, RecommendationOutput
+from app.agents.quiz.warm_cache import WarmCache
+
+
+def _answers(letters):
+    return {f"q{i}": f"{letter}. Réponse" for i, letter in enumerate(letters, 1)}
+
+
+def _fake_runner(calls):
+    def runner(answers):
+        calls.append(answers)
+        return RecommendationOutput(
+            profil_letter=answers["q1"][0],
+            profil_analysis=f"Analyse {len(calls)}",
+            principal_program=FormationDetails(name="IA & Productivité — ChatGPT Pro", reason="Raison"),
+            complementary_modules=[],
+            motivation_message="Go",
+        )
+    return runner
+
+
+def test_pattern_encoding_roundtrip():
+    pattern = encode_pattern(_answers("BBAC"))
+    assert pattern == "2213000000"
+    assert decode_pattern(pattern) == {"q1": "B", "q2": "B", "q3": "A", "q4": "C"}
+    # Réponse libre ou question hors q1..q10 : non codable
+    assert encode_pattern({"q1": "Je ne sais pas"}) is None
+    assert encode_pattern({"q11": "A. Réponse"}) is None
+
+
+def test_log_is_fixed_width_and_rotates(tmp_path):
+    log = PatternLog(tmp_path, max_bytes=RECORD.size * 3, backups=1)
+    for letters in ["BBBB", "BBBB", "AAAA", "CCCC", "BBBB"]:
+        log.append(_answers(letters))
+
+    assert RECORD.size == 10
+    assert os.path.getsize(log.path) == 2 * RECORD.size
+    assert os.path.getsize(tmp_path / "patterns.log.1") == 3 * RECORD.size
+    assert log.frequencies().most_common(1) == [("2222000000", 3)]
+    # Un seul exemplaire par motif distinct
+    assert len(log.load_exemplars()) == 3
+
+
+def test_exemplars_pruned_in_background_after_rotation(tmp_path):
+    log = PatternLog(tmp_path, max_bytes=RECORD.size * 2, backups=1)
+    for letters in ["AAAA", "BBBB", "CCCC", "CCCC", "DDDD"]:
+        log.append(_answers(letters))
+        if log._compaction_thread is not None:
+            log._compaction_thread.join(timeout=5)
+
+    # AAAA et BBBB ne sont plus dans le journal (patterns.log.1 = CCCC x2, patterns.log = DDDD)
+    assert set(log.load_exemplars()) == {"3333000000", "4444000000"}
+
+
+def test_exemplar_cap_never_reads_the_log_on_append(tmp_path, monkeypatch):
+    log = PatternLog(tmp_path, max_exemplars=2)
+    gate = threading.Event()
+    full_scan = log.frequencies
+
+    def slow_frequencies(since=None):
+        gate.wait(timeout=5)
+        return full_scan(since)
+
+    monkeypatch.setattr(log, "frequencies", slow_frequencies)
+    for letters in ["AAAA", "BBBB", "CCCC"]:
+        log.append(_answers(letters))
+
+    # Compactage bloqué en arrière-plan : les ajouts continuent, au-delà du plafond sans exemplaire
+    assert log._compaction_thread.is_alive()
+    log.append(_answers("DDDD"))
+    assert set(log.load_exemplars()) == {"1111000000", "2222000000"}
+
+    gate.set()
+    log._compaction_thread.join(timeout=5)
+    log.append(_answers("EEEE"))
+
+    exemplars = log.load_exemplars()
+    assert len(exemplars) <= 2 and "5555000000" in exemplars
+    assert sum(1 for _ in open(log.exemplars_path, encoding="utf-8")) == len(exemplars)
+
+
+def test_storage_dir_points_to_tmp_during_tests():
+    from app.agents.quiz.pattern_log import STORAGE_DIR, pattern_log
+
+    assert os.path.realpath(STORAGE_DIR) != os.path.realpath(
+        os.path.join(os.path.dirname(__file__), "..", "app", "agents", "quiz", "storage")
+    )
+    assert pattern_log.root == STORAGE_DIR
+
+
+def test_prewarm_serves_top_patterns_and_rewarms_on_context_change(tmp_path):
+    context = tmp_path / "context.txt"
+    context.write_text("catalogue v1", encoding="utf-8")
+    log = PatternLog(tmp_path)
+    for letters in ["BBBB"] * 3 + ["AAAA"] * 2 + ["CCCC"]:
+        log.append(_answers(letters))
+
+    calls = []
+    cache = WarmCache(tmp_path / "warm_cache.json", context_path=str(context), runner=_fake_runner(calls), workers=1)
+
+    assert [p for p, _, _ in select_patterns(log, 2)] == ["2222000000", "1111000000"]
+    summary = run(log, cache, top_n=2)
+    assert summary["written"] == 2 and summary["coverage"] == 5 / 6
+
+    # Même motif, libellés différents : servi depuis le cache
+    hit = cache.get({f"q{i}": "B) autre libellé" for i in range(1, 5)})
+    assert hit is not None and hit.profil_letter == "B"
+    assert cache.get(_answers("CCCC")) is None
+
+    # context.txt change : plus servi, puis re-chauffé en arrière-plan
+    context.write_text("catalogue v2", encoding="utf-8")
+    os.utime(context, (0, 0))
+    assert cache.get(_answers("BBBB")) is None
+    cache._rewarm_thread.join(timeout=5)
+    assert len(calls) == 4
+    assert cache.get(_answers("BBBB")).profil_analysis in {"Analyse 3", "Analyse 4"}
+
+
+def test_off_peak_window():
+    assert in_off_peak_window(3, "2-6")
+    assert not in_off_peak_window(6, "2-6")
+    assert in_off_peak_window(23, "22-4") and in_off_peak_window(1, "22-4")
+    assert not in_off_peak_window(12, "22-4")
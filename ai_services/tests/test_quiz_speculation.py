@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+from app.agents.quiz.schemas import FormationDetails, RecommendationOutput
+from app.agents.quiz.speculation import SpeculationManager, estimate_profile, is_profile_stable
+
+
+def _answers(letters):
+    return {f"q{i}": f"{letter}. Réponse" for i, letter in enumerate(letters, 1)}
+
+
+def _recommendation(letter):
+    return RecommendationOutput(
+        profil_letter=letter,
+        profil_analysis="Analyse",
+        principal_program=FormationDetails(name="IA & Productivité — ChatGPT Pro", reason="Raison"),
+        complementary_modules=[],
+        motivation_message="Go",
+    )
+
+
+def _fake_runner(calls, gate=None):
+    def runner(answers):
+        calls.append(answers)
+        if gate is not None:
+            gate.wait(timeout=5)
+        letter, _ = estimate_profile(answers)
+        return _recommendation(letter), {"input_tokens": 1000, "output_tokens": 400}, None
+    return runner
+
+
+def test_estimate_profile_counts_letters():
+    letter, counts = estimate_profile(_answers("BBABC"))
+    assert letter == "B"
+    assert counts == {"B": 3, "A": 1, "C": 1}
+
+
+def test_profile_stability():
+    # Trop tôt et trop serré
+    assert not is_profile_stable(_answers("BAB"))
+    # Assez de réponses et écart suffisant
+    assert is_profile_stable(_answers("BBBAB"))
+    # Égalité en tête : jamais stable
+    assert not is_profile_stable(_answers("AABBC"))
+
+
+def test_speculation_hit_reuses_result():
+    calls = []
+    manager = SpeculationManager(runner=_fake_runner(calls), max_workers=1)
+
+    status = manager.submit_partial(None, _answers("BBBAB"))
+    assert status["stable"] and status["speculating"]
+
+    # La même session continue : pas de second appel tant que le profil tient
+    manager.submit_partial(status["session_id"], _answers("BBBABB"))
+    res, _, _ = asyncio.run(manager.resolve(status["session_id"], _answers("BBBABBBCBB")))
+
+    assert res.profil_letter == "B"
+    assert len(calls) == 1
+    metrics = manager.metrics()
+    assert metrics["hits"] == 1 and metrics["hit_rate"] == 1.0
+    assert metrics["wasted_tokens"] == 0
+
+
+def test_speculation_miss_counts_wasted_tokens():
+    calls = []
+    manager = SpeculationManager(runner=_fake_runner(calls), max_workers=1)
+
+    status = manager.submit_partial(None, _answers("BBBAB"))
+    # Laisse l'appel spéculatif se terminer avant le submit final
+    manager._sessions[status["session_id"]].speculation.future.result(timeout=5)
+
+    res = asyncio.run(manager.resolve(status["session_id"], _answers("BBBABAAAAA")))
+
+    assert res is None
+    metrics = manager.metrics()
+    assert metrics["misses"] == 1 and metrics["hit_rate"] == 0.0
+    assert metrics["wasted_tokens"] == 1400
+
+
+def test_speculation_cancelled_before_start_wastes_nothing():
+    calls = []
+    gate = threading.Event()
+    manager = SpeculationManager(runner=_fake_runner(calls, gate), max_workers=1)
+
+    # Le premier appel occupe l'unique worker, le second reste en file
+    manager.submit_partial("s1", _answers("BBBAB"))
+    manager.submit_partial("s2", _answers("CCCAC"))
+    # Bascule de profil pour s2 : l'appel en file est annulé sans être parti
+    manager.submit_partial("s2", _answers("CCCACAAAA"))
+    gate.set()
+
+    metrics = manager.metrics()
+    assert metrics["cancelled_before_start"] == 1
+    assert metrics["wasted_tokens"] == 0
+
+
+def test_final_submit_without_session_is_not_speculative():
+    manager = SpeculationManager(runner=_fake_runner([]), max_workers=1)
+    assert asyncio.run(manager.resolve(None, _answers("BBBBB"))) is None
+    assert manager.metrics()["hits"] == 0
+
+
+class _HitCache:
+    def get(self, answers):
+        return _recommendation("B")
+
+
+def test_warm_cache_hit_closes_speculative_session(tmp_path, monkeypatch):
+    import app.main as main_module
+    from app.agents.quiz.pattern_log import PatternLog
+    from fastapi.testclient import TestClient
+
+    manager = SpeculationManager(runner=_fake_runner([]), max_workers=1)
+    monkeypatch.setattr(main_module, "speculation_manager", manager)
+    monkeypatch.setattr(main_module, "warm_cache", _HitCache())
+    monkeypatch.setattr(main_module, "pattern_log", PatternLog(tmp_path))
+
+    status = manager.submit_partial(None, _answers("BBBAB"))
+    manager._sessions[status["session_id"]].speculation.future.result(timeout=5)
+
+    response = TestClient(main_module.app).post(
+        "/api/recommander", json={"session_id": status["session_id"], "answers": _answers("BBBABBBCBB")}
+    )
+
+    assert response.headers["X-Cache"] == "hit"
+    metrics = manager.metrics()
+    assert metrics["active_sessions"] == 0 and metrics["superseded"] == 1
+    # Ni réutilisée ni ratée : le taux de réutilisation n'est pas faussé
+    assert metrics["hits"] == 0 and metrics["misses"] == 0
+    assert metrics["wasted_tokens"] == 1400